@@ -0,0 +1,129 @@
+import argparse
+import os
+import sys
+
+from core.tuner_engine import TunerEngine
+from core.offline_analysis import frame_count, track_file, write_csv, write_npy
+from core.corpus_analysis import CorpusAnalyzer, find_wav_files
+from utils.wav_file import WavReader
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Pitch-track WAV files without an audio device."
+    )
+    parser.add_argument(
+        "inputs", nargs="+",
+        help="WAV files or directories (searched recursively)",
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="output file (.csv or .npy) for a single input; "
+             "defaults to <input>.csv",
+    )
+    parser.add_argument(
+        "--output-dir",
+        help="directory for corpus results; defaults to next to each input",
+    )
+    parser.add_argument("--format", choices=("csv", "npy"), default="csv")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="worker processes; 0 uses every core",
+    )
+    parser.add_argument("--buffer-size", type=int, default=2048)
+    parser.add_argument("--hop", type=int, default=512)
+    parser.add_argument("--fmin", type=float, default=70)
+    parser.add_argument("--fmax", type=float, default=1000)
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--a4", type=float, default=440.0)
+    parser.add_argument(
+        "--chunk-seconds", type=float, default=30.0,
+        help="audio read per step; bounds memory use",
+    )
+    return parser.parse_args(argv)
+
+
+def tuner_kwargs(args):
+    return {
+        "buffer_size": args.buffer_size,
+        "fmin": args.fmin,
+        "fmax": args.fmax,
+        "threshold": args.threshold,
+    }
+
+
+def output_path(args, path):
+    name = os.path.splitext(os.path.basename(path))[0] + "." + args.format
+    directory = args.output_dir or os.path.dirname(path)
+    return os.path.join(directory, name)
+
+
+def write_track(path, chunks, n_frames, a4):
+    if path.endswith(".npy"):
+        write_npy(path, chunks, n_frames, a4=a4)
+    else:
+        write_csv(path, chunks, a4=a4)
+
+
+# -------------------------
+
+
+def analyze_file(args, path):
+    output = args.output or output_path(args, path)
+
+    with WavReader(path) as reader:
+        tuner = TunerEngine(sample_rate=reader.sample_rate, **tuner_kwargs(args))
+        chunks = track_file(reader, tuner, args.hop, args.chunk_seconds)
+        n_frames = frame_count(reader.frames, args.buffer_size, args.hop)
+        write_track(output, chunks, n_frames, args.a4)
+
+    print(f"{path} -> {output}")
+
+
+def analyze_corpus(args, files):
+    analyzer = CorpusAnalyzer(
+        jobs=args.jobs or None,
+        hop_size=args.hop,
+        chunk_seconds=args.chunk_seconds,
+        **tuner_kwargs(args),
+    )
+    analyzer.register_progress_callback(print_progress)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    for path, times, frequencies in analyzer.run(files):
+        output = output_path(args, path)
+        write_track(output, [(times, frequencies)], len(times), args.a4)
+        print(f"{path} -> {output}")
+
+
+def print_progress(done, total, audio_seconds, realtime_factor):
+    print(
+        f"\r{done}/{total} chunks  {audio_seconds:.0f} s audio  "
+        f"{realtime_factor:.1f}x realtime",
+        end="\n" if done == total else "",
+        flush=True,
+    )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    files = find_wav_files(args.inputs)
+
+    if args.output and len(files) != 1:
+        print("Error: --output needs exactly one input file", file=sys.stderr)
+        sys.exit(2)
+
+    try:
+        if len(files) == 1 and args.jobs == 1:
+            analyze_file(args, files[0])
+        else:
+            analyze_corpus(args, files)
+    except (OSError, ValueError) as e:
+        print("Error:", e, file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import numpy as np
+
+from core import dsp_utils
+from core.decimator import Decimator
+from core.oscillator import sine_table
+from core.pipeline import tuner_pipeline
+from core.tuner_engine import TunerEngine
+from utils.note_utils import frequency_to_note, frequencies_to_notes
+from utils.synth import tone, white_noise
+
+
+SAMPLE_RATE = 44100
+
+
+class Case:
+    """
+    One benchmark: func() is timed per call; setup(), if given, runs
+    before each call outside the timed region. audio_seconds is the
+    amount of audio one call handles, used for the realtime factor.
+    """
+
+    def __init__(self, name, func, audio_seconds=None, setup=None):
+        self.name = name
+        self.func = func
+        self.audio_seconds = audio_seconds
+        self.setup = setup
+
+
+# -------------------------
+# Cases
+
+
+def tuner_cases():
+    cases = []
+
+    for buffer_size in (1024, 2048, 4096):
+        for fmin, fmax in ((70, 1000), (30, 1000), (70, 2000)):
+            for kind in ("voiced", "silent"):
+                tuner = TunerEngine(
+                    sample_rate=SAMPLE_RATE,
+                    buffer_size=buffer_size,
+                    fmin=fmin,
+                    fmax=fmax,
+                )
+                if kind == "voiced":
+                    block = tone(
+                        110.0, buffer_size, SAMPLE_RATE,
+                        harmonics=(1.0, 0.5, 0.3),
+                    )
+                else:
+                    block = white_noise(buffer_size, amplitude=0.001)
+
+                cases.append(Case(
+                    f"tuner.process[n={buffer_size},fmin={fmin},"
+                    f"fmax={fmax},{kind}]",
+                    lambda t=tuner, b=block: t.process(b),
+                    audio_seconds=buffer_size / SAMPLE_RATE,
+                ))
+
+    for buffer_size, fmin in ((2048, 70), (8192, 30), (16384, 30)):
+        for coarse_factor in (None, 8):
+            tuner = TunerEngine(
+                sample_rate=SAMPLE_RATE,
+                buffer_size=buffer_size,
+                fmin=fmin,
+                coarse_factor=coarse_factor,
+            )
+            block = tone(
+                1.3 * fmin, buffer_size, SAMPLE_RATE,
+                harmonics=(1.0, 0.5, 0.3),
+            )
+
+            cases.append(Case(
+                f"tuner.process[n={buffer_size},fmin={fmin},"
+                f"coarse={coarse_factor}]",
+                lambda t=tuner, b=block: t.process(b),
+                audio_seconds=buffer_size / SAMPLE_RATE,
+            ))
+
+    for sample_rate in (48000, 96000):
+        for decimate in (False, "auto", True):
+            tuner = TunerEngine(
+                sample_rate=sample_rate,
+                buffer_size=2048 * sample_rate // SAMPLE_RATE,
+                hop_size=512,
+                decimate=decimate,
+            )
+            block = tone(110.0, 512, sample_rate, harmonics=(1.0, 0.5, 0.3))
+
+            cases.append(Case(
+                f"tuner.process_stream[sr={sample_rate},hop=512,"
+                f"decimate={decimate}]",
+                lambda t=tuner, b=block: t.process_stream(b),
+                audio_seconds=512 / sample_rate,
+            ))
+
+    for channels in (1, 4, 8):
+        tuner = TunerEngine(sample_rate=SAMPLE_RATE, hop_size=512)
+        block = np.stack([
+            tone(110.0 * (1 + c / 8), 512, SAMPLE_RATE, harmonics=(1.0, 0.5))
+            for c in range(channels)
+        ])
+
+        cases.append(Case(
+            f"tuner.process_stream[channels={channels},hop=512]",
+            lambda t=tuner, b=block: t.process_stream(b),
+            audio_seconds=512 / SAMPLE_RATE,
+        ))
+
+    pipeline = tuner_pipeline(SAMPLE_RATE, hop_size=512)
+    block = tone(110.0, 512, SAMPLE_RATE, harmonics=(1.0, 0.5, 0.3))
+    cases.append(Case(
+        "pipeline.process[tuner,hop=512]",
+        lambda p=pipeline, b=block: p.process(b),
+        audio_seconds=512 / SAMPLE_RATE,
+    ))
+
+    pipeline = tuner_pipeline(SAMPLE_RATE, hop_size=512)
+    block = np.stack([
+        tone(110.0 * (1 + c / 8), 512, SAMPLE_RATE, harmonics=(1.0, 0.5))
+        for c in range(4)
+    ])
+    cases.append(Case(
+        "pipeline.process[tuner,channels=4,hop=512]",
+        lambda p=pipeline, b=block: p.process(b),
+        audio_seconds=512 / SAMPLE_RATE,
+    ))
+
+    return cases
+
+
+def kernel_cases():
+    """
+    Each dsp_utils kernel under every available backend. The backend is
+    switched in setup, outside the timed call.
+    """
+    cases = []
+    frame = tone(110.0, 2048, SAMPLE_RATE, harmonics=(1.0, 0.5)).astype(float)
+    d = dsp_utils.difference(frame, 630)
+    taps = Decimator(5).taps
+    out = np.zeros(512, dtype="float32")
+    table = sine_table()
+    workspace = dsp_utils.WavetableWorkspace(512, table)
+
+    kernels = {
+        "difference[n=2048,max_tau=630]": (dsp_utils.difference, frame, 630),
+        "cmnd[630]": (dsp_utils.cmnd, d),
+        "rms[2048]": (dsp_utils.rms, frame),
+        "decimate[n=2048,factor=5]": (dsp_utils.decimate, frame, taps, 5),
+        "wavetable[512]": (dsp_utils.wavetable, out, table, 0, 42852281),
+        "wavetable[512,workspace]": (
+            dsp_utils.wavetable, out, table, 0, 42852281, 0, 1.0, 0.0,
+            workspace,
+        ),
+    }
+
+    for backend in dsp_utils.available_backends():
+        for name, (kernel, *args) in kernels.items():
+            cases.append(Case(
+                f"dsp_utils.{name}[{backend}]",
+                lambda k=kernel, a=args: k(*a),
+                setup=lambda b=backend: dsp_utils.use_backend(b),
+            ))
+
+    return cases
+
+
+def audio_engine_cases():
+    # AudioEngine imports sounddevice, which needs the PortAudio library
+    try:
+        from core.audio_engine import AudioEngine
+        from core.metronome_engine import MetronomeEngine
+    except (ImportError, OSError) as e:
+        print(f"Skipping audio engine benchmarks: {e}", file=sys.stderr)
+        return []
+
+    cases = []
+    blocksize = 512
+    out = np.zeros((blocksize, 1), dtype="float32")
+
+    engine = AudioEngine(samplerate=SAMPLE_RATE, blocksize=blocksize)
+    metronome = MetronomeEngine(engine)
+    click = metronome.accent_click
+
+    def enable_tone():
+        engine.enable_tone(440.0, 0.3)
+
+    def queue_click():
+        engine.enable_tone(440.0, 0.3)
+        if not engine.mixer.active_voices:
+            engine.play_buffer(click)
+
+    for name, setup in (("tone", enable_tone), ("tone+click", queue_click)):
+        cases.append(Case(
+            f"audio_engine._output_callback[{name},frames={blocksize}]",
+            lambda: engine._output_callback(out, blocksize, None, None),
+            audio_seconds=blocksize / SAMPLE_RATE,
+            setup=setup,
+        ))
+
+    cases.append(Case(
+        "metronome._generate_click[1600Hz]",
+        lambda: metronome._generate_click(1600),
+    ))
+
+    return cases
+
+
+def note_cases():
+    rng = np.random.default_rng(0)
+    track = rng.uniform(70, 1000, 1000)
+    track[::7] = np.nan
+
+    return [
+        Case(
+            "note_utils.frequency_to_note",
+            lambda: frequency_to_note(441.3, a4=440.0),
+        ),
+        Case(
+            "note_utils.frequencies_to_notes[1000]",
+            lambda: frequencies_to_notes(track, a4=440.0),
+        ),
+    ]
+
+
+def all_cases():
+    # kernel_cases switch the dsp_utils backend, so they run last
+    return (
+        tuner_cases() + audio_engine_cases() + note_cases() + kernel_cases()
+    )
+
+
+# -------------------------
+# Runner
+
+
+def run_case(case, repeat, warmup):
+    for _ in range(warmup):
+        if case.setup:
+            case.setup()
+        case.func()
+
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        if case.setup:
+            case.setup()
+        start = time.perf_counter_ns()
+        case.func()
+        timings[i] = time.perf_counter_ns() - start
+
+    timings /= 1000.0
+    result = {
+        "calls": repeat,
+        "mean_us": float(timings.mean()),
+        "p50_us": float(np.percentile(timings, 50)),
+        "p90_us": float(np.percentile(timings, 90)),
+        "p99_us": float(np.percentile(timings, 99)),
+        "max_us": float(timings.max()),
+    }
+
+    if case.audio_seconds:
+        result["realtime_factor"] = case.audio_seconds * 1e6 / result["mean_us"]
+
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """
+    Cases whose median latency grew by more than tolerance (a fraction)
+    relative to the baseline run.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+
+        ratio = result["p50_us"] / base["p50_us"]
+        if ratio > 1.0 + tolerance:
+            regressions.append((name, base["p50_us"], result["p50_us"], ratio))
+
+    return regressions
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+
+# -------------------------
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the DSP and audio hot paths."
+    )
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.10,
+        help="allowed median slowdown vs baseline (default 0.10 = 10%%)",
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument(
+        "-k", "--filter", default="",
+        help="only run cases whose name contains this text",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    results = {}
+    for case in all_cases():
+        if args.filter not in case.name:
+            continue
+
+        result = run_case(case, args.repeat, args.warmup)
+        results[case.name] = result
+
+        rtf = result.get("realtime_factor")
+        print(
+            f"{case.name:60s} p50 {result['p50_us']:9.1f} us  "
+            f"p99 {result['p99_us']:9.1f} us"
+            + (f"  {rtf:8.1f}x realtime" if rtf else "")
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"environment": environment(), "results": results},
+                f,
+                indent=4,
+            )
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["results"]
+
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, after, ratio in regressions:
+            print(
+                f"REGRESSION {name}: p50 {before:.1f} -> {after:.1f} us "
+                f"({ratio:.2f}x)"
+            )
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
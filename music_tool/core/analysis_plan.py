@@ -0,0 +1,77 @@
+import numpy as np
+
+
+# numpy.fft gained out= (and native float32 transforms) in NumPy 2.0.
+# On older versions the transforms allocate their result, which is then
+# copied into the plan's buffers.
+FFT_HAS_OUT = np.lib.NumpyVersion(np.__version__) >= "2.0.0"
+
+
+class AnalysisPlan:
+    """
+    Everything TunerEngine needs for one parameter set, computed once.
+
+    Holds the lag range, FFT size, lag index tables and the scratch
+    buffers used by the single-frame path, so steady-state processing
+    writes into existing arrays instead of allocating per frame.
+    """
+
+    def __init__(
+        self,
+        sample_rate,
+        buffer_size,
+        fmin,
+        fmax,
+        threshold,
+        dtype="float64",
+    ):
+        self.key = (sample_rate, buffer_size, fmin, fmax, threshold, dtype)
+
+        self.sample_rate = sample_rate
+        self.buffer_size = buffer_size
+        self.threshold = threshold
+        self.dtype = np.dtype(dtype)
+        self.complex_dtype = np.result_type(self.dtype, np.complex64)
+
+        self.max_tau = int(sample_rate / fmin)
+        self.min_tau = int(sample_rate / fmax)
+        self.n_fft = 1 << int(np.ceil(np.log2(buffer_size + self.max_tau)))
+
+        N = buffer_size
+        lags = np.arange(self.max_tau)
+        self.lags = lags.astype(self.dtype)
+        self.head_index = np.maximum(N - lags, 0)
+        self.tail_index = np.minimum(lags, N)
+
+        # Scratch buffers (single-frame path)
+        self.frame = np.zeros(N, self.dtype)
+        self.squared = np.zeros(N, self.dtype)
+        self.energy = np.zeros(N + 1, self.dtype)
+        # Prefix sums of the frame for the windowed CMND
+        self.sums = np.zeros(N + 1, self.dtype)
+        self.padded = np.zeros(self.n_fft, self.dtype)
+        self.spectrum = np.zeros(self.n_fft // 2 + 1, self.complex_dtype)
+        self.conj = np.zeros_like(self.spectrum)
+        self.acf = np.zeros(self.n_fft, self.dtype)
+        self.d = np.zeros(self.max_tau, self.dtype)
+        self.scratch = np.zeros(self.max_tau, self.dtype)
+        self.running_sum = np.zeros(self.max_tau, self.dtype)
+        self.nonzero = np.zeros(self.max_tau, dtype=bool)
+        self.cmnd = np.zeros(self.max_tau, self.dtype)
+        self.below = np.zeros(max(0, self.max_tau - self.min_tau), bool)
+
+    # -------------------------
+
+    def rfft(self, x):
+        if FFT_HAS_OUT and x.dtype == self.dtype:
+            return np.fft.rfft(x, out=self.spectrum)
+
+        self.spectrum[:] = np.fft.rfft(x)
+        return self.spectrum
+
+    def irfft(self, spectrum):
+        if FFT_HAS_OUT and spectrum.dtype == self.complex_dtype:
+            return np.fft.irfft(spectrum, self.n_fft, out=self.acf)
+
+        self.acf[:] = np.fft.irfft(spectrum, self.n_fft)
+        return self.acf
@@ -1,25 +1,71 @@
 import sounddevice as sd
-import numpy as np
-import threading
+import time
+
+from core.audio_metrics import AudioMetrics
+from core.dsp_worker import DSPWorker
+from core.mixer import Mixer
+from core.oscillator import Oscillator
 
 
 class AudioEngine:
-    def __init__(self, samplerate=44100, blocksize=2048):
+    def __init__(self, samplerate=44100, blocksize=2048, analysis_policy="all",
+                 channels=1, duplex=False):
         self.samplerate = samplerate
         self.blocksize = blocksize
+        self.analysis_policy = analysis_policy
+        # Input channels; with more than one, input callbacks receive
+        # (channels, samples) blocks
+        self.channels = channels
+
+        # With duplex, input and output share one sd.Stream and callback
+        # (see start_duplex_stream); otherwise each has its own stream
+        self.duplex = duplex
 
         self.input_stream = None
         self.output_stream = None
+        self.duplex_stream = None
+        self._input_enabled = False
+        self._output_enabled = False
+
+        # Position of the latest input block's first sample. In duplex
+        # mode it is on the output timeline (output_sample when the block
+        # arrived); otherwise it counts input samples on their own.
+        self.input_sample = 0
+        self._input_clock = 0
+
+        # Output-to-input round trip in samples, as measured by
+        # core.latency_calibration; 0 until calibrated
+        self.round_trip_latency = 0
 
         self.input_callback = None
-        self._lock = threading.Lock()
+        self.dsp_worker = None
+
+        # Scheduled sample playback (metronome clicks); lock-free, see Mixer
+        self.mixer = Mixer(blocksize)
 
-        self._play_buffer = np.zeros(0, dtype="float32")
+        # Callback timings, xrun counts and buffer depths (see snapshot())
+        self.metrics = AudioMetrics(samplerate)
+        self.metrics.add_gauge(
+            "mixer_voices", lambda: self.mixer.active_voices
+        )
+        self.metrics.add_gauge(
+            "mixer_pending", lambda: self.mixer.pending
+        )
+        self.metrics.add_gauge(
+            "mixer_dropped", lambda: self.mixer.dropped
+        )
+        self.metrics.add_gauge(
+            "analysis_queue_depth", self._analysis_queue_depth
+        )
+        self.metrics.add_gauge(
+            "dropped_analysis_blocks", self._dropped_analysis
+        )
+        self.metrics.add_gauge(
+            "analysis_errors", self._analysis_errors
+        )
 
-        self.tone_enabled = False
-        self.tone_frequency = 440.0
-        self.tone_volume = 0.3
-        self._phase = 0.0
+        # Reference tone voices (see enable_tone)
+        self.oscillator = Oscillator(samplerate, blocksize)
 
     # ------------------------------------------------
     # INPUT
@@ -28,20 +74,50 @@ class AudioEngine:
     def register_input_callback(self, callback):
         self.input_callback = callback
 
-    def _input_callback(self, indata, frames, time, status):
-        if status:
-            print("Input status:", status)
+    def _input_callback(self, indata, frames, time_info, status):
+        start = time.perf_counter_ns()
 
+        self._capture(indata, self._input_clock)
+        self._input_clock += frames
+        self.metrics.input.record(start, frames, status)
+
+    def _capture(self, indata, block_start):
+        self.input_sample = block_start
+
+        # Only copy into the ring here; analysis runs on the DSP worker,
+        # which reports block_start for the block it is handling
+        # Read once: stop_input_stream() may clear it from another thread
+        # while a duplex stream keeps running for the output
+        worker = self.dsp_worker
+        if worker:
+            worker.push(
+                indata if self.channels > 1 else indata[:, 0], block_start
+            )
+
+    def _dispatch_input(self, audio_block):
         if self.input_callback:
-            audio_block = indata[:, 0].copy()
             self.input_callback(audio_block)
 
     def start_input_stream(self):
+        if self.dsp_worker is None:
+            self.dsp_worker = DSPWorker(
+                self._dispatch_input,
+                self.blocksize,
+                policy=self.analysis_policy,
+                channels=self.channels,
+            )
+            self.dsp_worker.start()
+
+        if self.duplex:
+            self._input_enabled = True
+            self.start_duplex_stream()
+            return
+
         if self.input_stream is None:
             self.input_stream = sd.InputStream(
                 samplerate=self.samplerate,
                 blocksize=self.blocksize,
-                channels=1,
+                channels=self.channels,
                 dtype="float32",
                 callback=self._input_callback,
             )
@@ -49,44 +125,41 @@ class AudioEngine:
             print("Input stream started.")
 
     def stop_input_stream(self):
+        self._input_enabled = False
+        if self.duplex and not self._output_enabled:
+            self.stop_duplex_stream()
+
         if self.input_stream:
             self.input_stream.stop()
             self.input_stream.close()
             self.input_stream = None
 
+        if self.dsp_worker:
+            self.dsp_worker.stop()
+            self.dsp_worker = None
+
     # ------------------------------------------------
     # OUTPUT
     # ------------------------------------------------
 
-    def _output_callback(self, outdata, frames, time, status):
-        if status:
-            print("Output status:", status)
+    def _output_callback(self, outdata, frames, time_info, status):
+        start = time.perf_counter_ns()
+        self._render(outdata, frames)
+        self.metrics.output.record(start, frames, status)
 
-        outdata.fill(0)
+    def _render(self, outdata, frames):
+        # Tone
+        outdata[:, 0] = self.oscillator.render(frames)
 
-        with self._lock:
-            # Tone
-            if self.tone_enabled:
-                t = np.arange(frames)
-                wave = self.tone_volume * np.sin(
-                    2 * np.pi * self.tone_frequency * t / self.samplerate
-                    + self._phase
-                )
-
-                self._phase += (
-                    2 * np.pi * self.tone_frequency * frames / self.samplerate
-                )
-                self._phase %= (2 * np.pi)
-
-                outdata[:, 0] += wave.astype("float32")
-
-            # Metronome
-            if len(self._play_buffer) > 0:
-                chunk = self._play_buffer[:frames]
-                outdata[:len(chunk), 0] += chunk
-                self._play_buffer = self._play_buffer[len(chunk):]
+        # Metronome
+        outdata[:, 0] += self.mixer.render(frames)
 
     def start_output_stream(self):
+        if self.duplex:
+            self._output_enabled = True
+            self.start_duplex_stream()
+            return
+
         if self.output_stream is None:
             self.output_stream = sd.OutputStream(
                 samplerate=self.samplerate,
@@ -98,25 +171,108 @@ class AudioEngine:
             self.output_stream.start()
 
     def stop_output_stream(self):
+        self._output_enabled = False
+        if self.duplex and not self._input_enabled:
+            self.stop_duplex_stream()
+
         if self.output_stream:
             self.output_stream.stop()
             self.output_stream.close()
             self.output_stream = None
 
     # ------------------------------------------------
+    # DUPLEX
+    # ------------------------------------------------
+
+    def _duplex_callback(self, indata, outdata, frames, time_info, status):
+        """
+        Capture and playback in one callback: the input block is stamped
+        with the output sample rendered at the same moment, so both sides
+        share one timeline. Metrics go to the output stats.
+        """
+        start = time.perf_counter_ns()
+
+        if self._input_enabled:
+            self._capture(indata, self.mixer.clock)
+
+        if self._output_enabled:
+            self._render(outdata, frames)
+        else:
+            outdata.fill(0)
+            self.mixer.skip(frames)
+
+        self.metrics.output.record(start, frames, status)
 
-    def play_buffer(self, buffer):
-        with self._lock:
-            self._play_buffer = np.concatenate(
-                (self._play_buffer, buffer.astype("float32"))
+    def start_duplex_stream(self):
+        """
+        Open the shared stream. start_input_stream/start_output_stream
+        call this in duplex mode and choose which sides are used; it is
+        closed again once both sides are stopped.
+        """
+        if self.duplex_stream is None:
+            self.duplex_stream = sd.Stream(
+                samplerate=self.samplerate,
+                blocksize=self.blocksize,
+                channels=(self.channels, 1),
+                dtype="float32",
+                callback=self._duplex_callback,
             )
+            self.duplex_stream.start()
+            print("Duplex stream started.")
+
+    def stop_duplex_stream(self):
+        if self.duplex_stream:
+            self.duplex_stream.stop()
+            self.duplex_stream.close()
+            self.duplex_stream = None
+
+    @property
+    def input_active(self):
+        return self._input_enabled or self.input_stream is not None
+
+    @property
+    def output_active(self):
+        return self._output_enabled or self.output_stream is not None
+
+    # ------------------------------------------------
+
+    def _analysis_queue_depth(self):
+        worker = self.dsp_worker
+        return worker.queue_depth if worker else 0
+
+    def _dropped_analysis(self):
+        worker = self.dsp_worker
+        return worker.dropped if worker else 0
+
+    def _analysis_errors(self):
+        worker = self.dsp_worker
+        return worker.errors if worker else 0
+
+    # ------------------------------------------------
+
+    def play_buffer(self, buffer, at=None, gain=1.0):
+        """
+        Mix buffer into the output, starting at output sample at (see
+        Mixer.play). Returns False if the mixer's backlog rejected it.
+        """
+        return self.mixer.play(buffer, at=at, gain=gain)
+
+    @property
+    def output_sample(self):
+        """
+        Output samples rendered so far (the mixer's clock).
+        """
+        return self.mixer.clock
 
-    def enable_tone(self, frequency, volume):
-        with self._lock:
-            self.tone_frequency = frequency
-            self.tone_volume = volume
-            self.tone_enabled = True
+    def enable_tone(self, frequency, volume, voice=0):
+        """
+        Play (or glide an already playing voice to) frequency at volume.
+        Several voices can sound at once for chords and drones.
+        """
+        self.oscillator.set_voice(voice, frequency, volume)
 
-    def disable_tone(self):
-        with self._lock:
-            self.tone_enabled = False
\ No newline at end of file
+    def disable_tone(self, voice=None):
+        """
+        Fade out one tone voice, or all of them.
+        """
+        self.oscillator.silence(voice)
\ No newline at end of file
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+
+
+# Upper edges (microseconds) of the callback duration histogram buckets;
+# a final bucket collects everything slower.
+HISTOGRAM_EDGES_US = (100, 200, 500, 1000, 2000, 5000, 10000, 20000)
+
+# sounddevice.CallbackFlags attributes that are counted
+STATUS_FLAGS = (
+    "input_overflow",
+    "input_underflow",
+    "output_overflow",
+    "output_underflow",
+    "priming_output",
+)
+
+
+class CallbackStats:
+    """
+    Counters for one PortAudio callback.
+
+    record() runs on the audio thread and only does integer arithmetic
+    and list increments: no locks, allocation or I/O.
+    """
+
+    def __init__(self, samplerate):
+        self.samplerate = samplerate
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.period_ns = 0
+        self.last_load = 0.0
+        self.max_load = 0.0
+        self.histogram = [0] * (len(HISTOGRAM_EDGES_US) + 1)
+        self.flags = dict.fromkeys(STATUS_FLAGS, 0)
+
+    def record(self, start_ns, frames, status=None):
+        elapsed = time.perf_counter_ns() - start_ns
+        period = frames * 1_000_000_000 // self.samplerate
+
+        self.calls += 1
+        self.total_ns += elapsed
+        self.period_ns += period
+        if elapsed > self.max_ns:
+            self.max_ns = elapsed
+
+        self.histogram[bisect_right(HISTOGRAM_EDGES_US, elapsed // 1000)] += 1
+
+        if period:
+            load = elapsed / period
+            self.last_load = load
+            if load > self.max_load:
+                self.max_load = load
+
+        if status:
+            for flag in STATUS_FLAGS:
+                if getattr(status, flag, False):
+                    self.flags[flag] += 1
+
+    def snapshot(self):
+        return {
+            "calls": self.calls,
+            "mean_us": self.total_ns / 1e3 / max(1, self.calls),
+            "max_us": self.max_ns / 1e3,
+            # Share of the block period spent inside the callback
+            "load_percent": 100 * self.total_ns / max(1, self.period_ns),
+            "last_load_percent": 100 * self.last_load,
+            "max_load_percent": 100 * self.max_load,
+            "histogram": {
+                "edges_us": list(HISTOGRAM_EDGES_US),
+                "counts": list(self.histogram),
+            },
+            **self.flags,
+        }
+
+
+class AudioMetrics:
+    """
+    Health metrics for the audio callbacks, readable from any thread.
+
+    The callbacks write plain counters without locking; snapshot() reads
+    them without stopping the audio threads, so each value is consistent
+    on its own but two values may be one callback apart. Gauges are
+    callables sampled at snapshot time (e.g. buffer depths).
+    """
+
+    def __init__(self, samplerate):
+        self.input = CallbackStats(samplerate)
+        self.output = CallbackStats(samplerate)
+        self._gauges = {}
+
+        self._dump_thread = None
+        self._dump_stop = threading.Event()
+
+    def add_gauge(self, name, func):
+        self._gauges[name] = func
+
+    def reset(self):
+        self.input.reset()
+        self.output.reset()
+
+    def snapshot(self):
+        snapshot = {
+            "time": time.time(),
+            "input": self.input.snapshot(),
+            "output": self.output.snapshot(),
+        }
+        for name, func in self._gauges.items():
+            snapshot[name] = func()
+        return snapshot
+
+    # -------------------------
+    # Periodic dump
+
+    def start_dump(self, path, interval=5.0):
+        """
+        Write a JSON snapshot to path every interval seconds from a
+        background thread. The file is replaced atomically, so readers
+        never see a partial write.
+        """
+        self.stop_dump()
+        self._dump_stop.clear()
+        self._dump_thread = threading.Thread(
+            target=self._dump_loop, args=(path, interval), daemon=True
+        )
+        self._dump_thread.start()
+
+    def stop_dump(self):
+        if self._dump_thread:
+            self._dump_stop.set()
+            self._dump_thread.join()
+            self._dump_thread = None
+
+    def dump(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f, indent=4)
+        os.replace(tmp_path, path)
+
+    def _dump_loop(self, path, interval):
+        while not self._dump_stop.wait(interval):
+            try:
+                self.dump(path)
+            except OSError as e:
+                print("Metrics dump error:", e)
+                return
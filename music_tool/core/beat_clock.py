@@ -0,0 +1,98 @@
+import math
+import numpy as np
+
+
+class BeatClock:
+    """
+    Onset positions of a beat grid, in closed form.
+
+    The tempo is bpm, or with end_bpm it moves linearly from bpm to
+    end_bpm over ramp_seconds and then holds (practice mode). Beat n
+    falls where the integral of the tempo reaches n beats, so onsets
+    carry no accumulated rounding or scheduling error however long the
+    clock runs. origin is the output sample of beat 0.
+    """
+
+    def __init__(self, sample_rate, bpm, end_bpm=None, ramp_seconds=0.0,
+                 origin=0):
+        self.sample_rate = sample_rate
+        self.bpm = bpm
+        self.end_bpm = bpm if end_bpm is None else end_bpm
+        self.ramp_seconds = max(0.0, ramp_seconds)
+        self.origin = origin
+
+        if self.end_bpm == bpm or not self.ramp_seconds:
+            self.ramp_seconds = 0.0
+            self.bpm = self.end_bpm
+
+        # Tempo slope in BPM per second, and the beats it takes to ramp
+        self._slope = (
+            (self.end_bpm - self.bpm) / self.ramp_seconds
+            if self.ramp_seconds else 0.0
+        )
+        self._ramp_beats = (
+            (self.bpm + self.end_bpm) / 2 * self.ramp_seconds / 60
+        )
+
+    # -------------------------
+
+    def time_of(self, beat):
+        """
+        Seconds from beat 0 to beat (which may be fractional).
+        """
+        if beat >= self._ramp_beats:
+            held = (beat - self._ramp_beats) * 60 / self.end_bpm
+            return self.ramp_seconds + held
+
+        # bpm * t + slope * t ** 2 / 2 = 60 * beat, solved in the form
+        # that stays accurate as the slope goes to zero
+        c = 60 * beat
+        return 2 * c / (
+            self.bpm + math.sqrt(self.bpm ** 2 + 2 * self._slope * c)
+        )
+
+    def is_steady(self, beat):
+        """
+        True if the tempo no longer changes from beat on.
+        """
+        return beat >= self._ramp_beats
+
+    def sample_of(self, beat):
+        return self.origin + round(self.time_of(beat) * self.sample_rate)
+
+    def samples_of(self, beats):
+        """
+        sample_of over an array of beats.
+        """
+        beats = np.asarray(beats, dtype=float)
+
+        held = (beats - self._ramp_beats) * 60 / self.end_bpm
+        held += self.ramp_seconds
+
+        c = 60 * np.minimum(beats, self._ramp_beats)
+        ramp = 2 * c / (
+            self.bpm + np.sqrt(self.bpm ** 2 + 2 * self._slope * c)
+        )
+
+        seconds = np.where(beats >= self._ramp_beats, held, ramp)
+        samples = np.rint(seconds * self.sample_rate).astype(np.int64)
+        return self.origin + samples
+
+    def tempo_at(self, seconds):
+        if seconds >= self.ramp_seconds:
+            return self.end_bpm
+        return self.bpm + self._slope * seconds
+
+    def tempo_of(self, beat):
+        return self.tempo_at(self.time_of(beat))
+
+    def beat_at(self, sample):
+        """
+        Fractional beat count at output sample (the inverse of
+        sample_of, before rounding).
+        """
+        t = (sample - self.origin) / self.sample_rate
+        if t >= self.ramp_seconds:
+            held = (t - self.ramp_seconds) * self.end_bpm / 60
+            return self._ramp_beats + held
+        return (self.bpm * t + self._slope * t * t / 2) / 60
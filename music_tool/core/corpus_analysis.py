@@ -0,0 +1,185 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+
+from core.tuner_engine import TunerEngine
+from core.offline_analysis import analyze_frames, frame_count
+from utils.wav_file import WavReader
+
+
+# Per-process state, set up once by _init_worker
+_worker = {}
+
+
+def find_wav_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(
+                    os.path.join(root, name)
+                    for name in sorted(names)
+                    if name.lower().endswith(".wav")
+                )
+        else:
+            files.append(path)
+    return files
+
+
+class CorpusJob:
+    """
+    One file of a corpus run and where its frames live in the shared
+    results array.
+    """
+
+    def __init__(self, path, sample_rate, n_frames, offset):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.n_frames = n_frames
+        self.offset = offset
+
+
+class CorpusAnalyzer:
+    """
+    Pitch-tracks many WAV files across a process pool.
+
+    Every worker process owns its own TunerEngine per sample rate. Files
+    are split into chunks of frames; each chunk reads its samples plus the
+    window overlap, so stitched results match a single pass exactly.
+    Frequencies are written straight into one shared-memory array instead
+    of being pickled back to the parent.
+    """
+
+    def __init__(
+        self,
+        jobs=None,
+        hop_size=512,
+        chunk_seconds=60.0,
+        **tuner_kwargs,
+    ):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.hop_size = hop_size
+        self.chunk_seconds = chunk_seconds
+        self.tuner_kwargs = tuner_kwargs
+        self.buffer_size = tuner_kwargs.get("buffer_size", 2048)
+
+        self.progress_callback = None
+
+    def register_progress_callback(self, callback):
+        """
+        callback(chunks_done, chunks_total, audio_seconds, realtime_factor)
+        """
+        self.progress_callback = callback
+
+    # -------------------------
+
+    def run(self, paths):
+        """
+        Analyse every file and yield (path, times, frequencies) per file.
+        """
+        files = self._plan(paths)
+        total = sum(job.n_frames for job in files)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(8, total * 8))
+        try:
+            results = np.ndarray((total,), dtype=np.float64, buffer=shm.buf)
+            results[:] = np.nan
+
+            self._execute(files, shm.name, total)
+
+            tracks = [
+                results[job.offset:job.offset + job.n_frames].copy()
+                for job in files
+            ]
+            del results
+        finally:
+            shm.close()
+            shm.unlink()
+
+        for job, frequencies in zip(files, tracks):
+            frames = np.arange(job.n_frames)
+            times = (
+                frames * self.hop_size + self.buffer_size / 2
+            ) / job.sample_rate
+            yield job.path, times, frequencies
+
+    def _plan(self, paths):
+        files = []
+        offset = 0
+        for path in paths:
+            with WavReader(path) as reader:
+                n = frame_count(reader.frames, self.buffer_size, self.hop_size)
+                files.append(CorpusJob(path, reader.sample_rate, n, offset))
+            offset += n
+        return files
+
+    def _execute(self, files, shm_name, total):
+        tasks = []
+        for job in files:
+            per_chunk = max(
+                1, int(self.chunk_seconds * job.sample_rate) // self.hop_size
+            )
+            for first in range(0, job.n_frames, per_chunk):
+                last = min(job.n_frames, first + per_chunk)
+                tasks.append((job, first, last))
+
+        started = time.perf_counter()
+        audio_seconds = 0.0
+
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=_init_worker,
+            initargs=(shm_name, total, self.tuner_kwargs),
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _analyze_chunk,
+                    job.path,
+                    job.offset,
+                    first,
+                    last,
+                    self.hop_size,
+                )
+                for job, first, last in tasks
+            ]
+
+            for done, future in enumerate(as_completed(futures), 1):
+                audio_seconds += future.result()
+
+                if self.progress_callback:
+                    elapsed = time.perf_counter() - started
+                    self.progress_callback(
+                        done,
+                        len(futures),
+                        audio_seconds,
+                        audio_seconds / elapsed if elapsed > 0 else 0.0,
+                    )
+
+
+# -------------------------
+# Worker process side
+
+
+def _init_worker(shm_name, total, tuner_kwargs):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker["shm"] = shm
+    _worker["results"] = np.ndarray((total,), dtype=np.float64, buffer=shm.buf)
+    _worker["tuner_kwargs"] = tuner_kwargs
+    _worker["tuners"] = {}
+
+
+def _analyze_chunk(path, offset, first, last, hop_size):
+    with WavReader(path) as reader:
+        tuners = _worker["tuners"]
+        if reader.sample_rate not in tuners:
+            tuners[reader.sample_rate] = TunerEngine(
+                sample_rate=reader.sample_rate, **_worker["tuner_kwargs"]
+            )
+        tuner = tuners[reader.sample_rate]
+
+        _, frequencies = analyze_frames(reader, tuner, hop_size, first, last)
+        _worker["results"][offset + first:offset + last] = frequencies
+
+        return (last - first) * hop_size / reader.sample_rate
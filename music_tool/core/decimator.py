@@ -0,0 +1,76 @@
+import numpy as np
+
+from core import dsp_utils
+
+
+class Decimator:
+    """
+    Anti-aliased integer-factor decimator.
+
+    A Kaiser-windowed sinc low-pass is evaluated only at the retained
+    output samples (the polyphase form: taps multiply-adds per output,
+    nothing computed for discarded samples).
+
+    process() is for contiguous streams and carries the filter history
+    and output phase across blocks of any length; blocks may be 1-D or
+    (channels, samples), filtered along the last axis. decimate() handles
+    independent frames (1-D or stacked 2-D) without touching that state.
+    """
+
+    def __init__(self, factor, taps_per_phase=20, cutoff=0.8, beta=6.0):
+        self.factor = int(factor)
+        if self.factor < 1:
+            raise ValueError("factor must be >= 1")
+
+        # cutoff is relative to the output Nyquist frequency
+        num_taps = taps_per_phase * self.factor + 1
+        n = np.arange(num_taps) - (num_taps - 1) / 2
+        fc = cutoff * 0.5 / self.factor
+
+        taps = 2 * fc * np.sinc(2 * fc * n) * np.kaiser(num_taps, beta)
+        taps /= taps.sum()
+
+        # Reversed so a window dotted with it is the convolution sum
+        self.taps = taps[::-1].copy()
+        self.delay = (num_taps - 1) / 2
+
+        self.reset()
+
+    def reset(self):
+        self._history = np.zeros(len(self.taps) - 1)
+        # Input samples to skip before the next retained output
+        self._skip = 0
+
+    # -------------------------
+
+    def process(self, block):
+        if self.factor == 1:
+            return np.asarray(block, dtype=float)
+
+        L = len(self.taps)
+        block = np.asarray(block)
+        if self._history.shape[:-1] != block.shape[:-1]:
+            self._history = np.zeros(block.shape[:-1] + (L - 1,))
+
+        x = np.concatenate((self._history, block), axis=-1)
+
+        out = dsp_utils.decimate(x, self.taps, self.factor, self._skip)
+
+        self._history = x[..., x.shape[-1] - (L - 1):].copy()
+        self._skip = (self._skip - block.shape[-1]) % self.factor
+        return out
+
+    def decimate(self, frames):
+        """
+        Decimate along the last axis. Each frame is filtered on its own,
+        with its start reflected to prime the filter.
+        """
+        frames = np.asarray(frames, dtype=float)
+        if self.factor == 1:
+            return frames
+
+        L = len(self.taps)
+        pad = [(0, 0)] * (frames.ndim - 1) + [(L - 1, 0)]
+        x = np.pad(frames, pad, mode="reflect")
+
+        return dsp_utils.decimate(x, self.taps, self.factor)
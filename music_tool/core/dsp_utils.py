@@ -0,0 +1,529 @@
+"""
+Kernel registry for the DSP hot paths.
+
+Every backend provides some or all of KERNELS; anything it leaves out
+falls back to the NumPy reference backend, which is always available.
+The backend is chosen at import time: the one named by the
+PULSELAB_DSP_BACKEND environment variable if set, otherwise "numba"
+when Numba is installed, otherwise "numpy". use_backend() switches at
+run time, and verify_backend() checks a backend against the reference
+(python -m core.dsp_utils checks every available one). A backend may
+register a warm-up, which use_backend() runs the first time it is
+selected so JIT compilation never lands in an audio callback.
+"""
+
+import cmath
+import os
+import sys
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+BACKEND_ENV = "PULSELAB_DSP_BACKEND"
+
+KERNELS = ("difference", "cmnd", "rms", "decimate", "wavetable")
+
+# Oscillator phases are 32-bit fixed point: one cycle is 2 ** 32
+PHASE_MASK = 0xFFFFFFFF
+
+_BACKENDS = {}
+_WARMUPS = {}
+_warmed = set()
+_active = {}
+_active_name = None
+
+
+def register_backend(name, kernels, warmup=None):
+    unknown = set(kernels) - set(KERNELS)
+    if unknown:
+        raise ValueError(f"unknown kernels: {sorted(unknown)}")
+    _BACKENDS[name] = dict(kernels)
+    if warmup is not None:
+        _WARMUPS[name] = warmup
+
+
+def available_backends():
+    return list(_BACKENDS)
+
+
+def current_backend():
+    return _active_name
+
+
+def use_backend(name):
+    global _active_name
+
+    if name not in _BACKENDS:
+        raise ValueError(
+            f"unknown DSP backend {name!r}; available: {available_backends()}"
+        )
+
+    if name in _WARMUPS and name not in _warmed:
+        _WARMUPS[name]()
+        _warmed.add(name)
+
+    kernels = dict(_BACKENDS["numpy"])
+    kernels.update(_BACKENDS[name])
+
+    _active.clear()
+    _active.update(kernels)
+    _active_name = name
+
+
+# -------------------------
+# Kernels (dispatch to the active backend)
+
+
+def difference(x, max_tau):
+    """
+    YIN difference function d(tau) = sum((x[:-tau] - x[tau:]) ** 2) for
+    tau < max_tau, along the last axis (x may be one frame or a stack).
+    """
+    return _active["difference"](x, max_tau)
+
+
+def cmnd(d):
+    """
+    Cumulative mean normalized difference, along the last axis. Lags
+    whose running sum is zero (including tau=0) are 1.
+    """
+    return _active["cmnd"](d)
+
+
+def rms(x):
+    """
+    Root mean square along the last axis.
+    """
+    return _active["rms"](x)
+
+
+def decimate(x, taps, factor, skip=0):
+    """
+    FIR filter and downsample along the last axis, computing only the
+    retained outputs: y[k] = dot(x[skip + k * factor:][:len(taps)], taps).
+    taps are in window order (i.e. the impulse response reversed).
+    """
+    return _active["decimate"](x, taps, factor, skip)
+
+
+def wavetable(out, table, phase, increment, step=0, amplitude=1.0,
+              amp_step=0.0, workspace=None):
+    """
+    Add one wavetable oscillator segment into out:
+        out[i] += (amplitude + i * amp_step) * table(phase_i)
+
+    phase is a 32-bit accumulator advancing by increment, which itself
+    changes by step per sample (a linear frequency ramp). table has
+    2 ** k + 1 entries, the last repeating the first; the top k phase
+    bits index it and the rest interpolate linearly. Returns the phase
+    for the sample after the last one.
+
+    workspace is an optional WavetableWorkspace for table, kept by the
+    caller across calls (one per voice) so nothing is allocated per
+    block.
+    """
+    return _active["wavetable"](
+        out, table, phase, increment, step, amplitude, amp_step, workspace
+    )
+
+
+class WavetableWorkspace:
+    """
+    Scratch buffers for wavetable() on segments of up to size samples.
+
+    For a sine table at a steady frequency and amplitude the NumPy
+    kernel skips the table: the segment is Im(a * exp(1j * phase_i)),
+    one complex multiply by exp(1j * increment * i), which is kept here
+    until the increment changes. NumPy runs about a dozen ufuncs for the
+    lookup, each with a fixed overhead that dominates at block sizes.
+    """
+
+    def __init__(self, size, table=None):
+        self.sine = table is not None and _is_sine_table(table)
+        self._allocate(size)
+
+    def _allocate(self, size):
+        self.size = size
+
+        self.ramp = np.arange(size, dtype=np.int64)
+        # ramp * (ramp - 1) // 2, built on the first frequency ramp
+        self.triangle = None
+        self.phase = np.zeros(size, dtype=np.int64)
+        self.index = np.zeros(size, dtype=np.int64)
+        self.frac = np.zeros(size, dtype=np.float32)
+        self.low = np.zeros(size, dtype=np.float32)
+        self.value = np.zeros(size, dtype=np.float32)
+
+        if self.sine:
+            self.rotation = np.zeros(size, dtype=np.complex64)
+            self.rotated = np.zeros(size, dtype=np.complex64)
+        self.increment = None
+
+    def reserve(self, size):
+        if size > self.size:
+            self._allocate(size)
+
+
+def _is_sine_table(table):
+    size = len(table) - 1
+    sine = np.sin(2 * np.pi * np.arange(size) / size)
+    return bool(np.allclose(table[:size], sine, rtol=0, atol=1e-6))
+
+
+# -------------------------
+# NumPy reference backend
+
+
+def _numpy_difference(x, max_tau):
+    # energy(x[:-tau]) + energy(x[tau:]) - 2 * acf(tau): the whole lag
+    # range costs one real FFT instead of a loop over lags
+    N = x.shape[-1]
+    n_fft = 1 << int(np.ceil(np.log2(N + max_tau)))
+
+    spectrum = np.fft.rfft(x, n_fft, axis=-1)
+    acf = np.fft.irfft(
+        spectrum * np.conj(spectrum), n_fft, axis=-1
+    )[..., :max_tau]
+
+    energy = np.zeros(x.shape[:-1] + (N + 1,), dtype=x.dtype)
+    np.cumsum(x * x, axis=-1, out=energy[..., 1:])
+
+    lags = np.arange(max_tau)
+    head = energy[..., np.maximum(N - lags, 0)]
+    tail = energy[..., N:] - energy[..., np.minimum(lags, N)]
+
+    d = head + tail - 2 * acf
+    d[..., 0] = 0.0
+
+    # Round-off can leave tiny negatives where the true value is 0
+    np.maximum(d, 0.0, out=d)
+    return d
+
+
+def _numpy_cmnd(d):
+    running_sum = np.cumsum(d, axis=-1)
+    tau = np.arange(d.shape[-1], dtype=d.dtype)
+
+    out = np.ones_like(d)
+    np.divide(d * tau, running_sum, out=out, where=running_sum != 0)
+    return out
+
+
+def _numpy_rms(x):
+    return np.sqrt(np.mean(x * x, axis=-1))
+
+
+def _numpy_decimate(x, taps, factor, skip=0):
+    # np.dot copies the strided windows to a contiguous block and uses
+    # BLAS; matmul on the strided view is several times slower
+    windows = sliding_window_view(x, len(taps), axis=-1)
+    return np.dot(windows[..., skip::factor, :], taps)
+
+
+def _table_frac_bits(table):
+    return 32 - (len(table) - 2).bit_length()
+
+
+def _numpy_wavetable(out, table, phase, increment, step=0, amplitude=1.0,
+                     amp_step=0.0, workspace=None):
+    n = len(out)
+    if workspace is None:
+        workspace = WavetableWorkspace(n)
+    else:
+        workspace.reserve(n)
+
+    if workspace.sine and not step and not amp_step:
+        _numpy_rotate(out, phase, increment, amplitude, workspace)
+    else:
+        _numpy_lookup(
+            out, table, phase, increment, step, amplitude, amp_step,
+            workspace,
+        )
+
+    return (phase + increment * n + step * (n * (n - 1) // 2)) & PHASE_MASK
+
+
+def _numpy_rotate(out, phase, increment, amplitude, workspace):
+    n = len(out)
+    if workspace.increment != increment:
+        # Once per frequency change
+        theta = 2 * np.pi * increment / (PHASE_MASK + 1)
+        workspace.rotation[:] = np.exp(1j * theta * workspace.ramp)
+        workspace.increment = increment
+
+    start = amplitude * cmath.exp(2j * np.pi * phase / (PHASE_MASK + 1))
+    rotated = workspace.rotated[:n]
+    np.multiply(workspace.rotation[:n], start, out=rotated)
+    out += rotated.imag
+
+
+def _numpy_lookup(out, table, phase, increment, step, amplitude, amp_step,
+                  workspace):
+    n = len(out)
+    frac_bits = _table_frac_bits(table)
+
+    ramp = workspace.ramp[:n]
+    p = workspace.phase[:n]
+    index = workspace.index[:n]
+    frac = workspace.frac[:n]
+    low = workspace.low[:n]
+    value = workspace.value[:n]
+
+    # Closed form of the accumulator, so there is no running sum; the
+    # ramp terms are skipped when constant
+    np.multiply(ramp, increment, out=p)
+    if step:
+        if workspace.triangle is None:
+            ramp_all = workspace.ramp
+            workspace.triangle = ramp_all * (ramp_all - 1) // 2
+        np.multiply(workspace.triangle[:n], step, out=index)
+        p += index
+    p += phase
+    p &= PHASE_MASK
+
+    np.right_shift(p, frac_bits, out=index)
+    p &= (1 << frac_bits) - 1
+    np.multiply(p, 1.0 / (1 << frac_bits), out=frac, casting="unsafe")
+
+    np.take(table, index, out=low)
+    index += 1
+    np.take(table, index, out=value)
+    value -= low
+    value *= frac
+    value += low
+
+    if amp_step:
+        np.multiply(ramp, amp_step, out=frac, casting="unsafe")
+        frac += amplitude
+        value *= frac
+    else:
+        value *= amplitude
+    out += value
+
+
+register_backend("numpy", {
+    "difference": _numpy_difference,
+    "cmnd": _numpy_cmnd,
+    "rms": _numpy_rms,
+    "decimate": _numpy_decimate,
+    "wavetable": _numpy_wavetable,
+})
+
+
+# -------------------------
+# Numba backend
+#
+# Single-pass loops for the kernels NumPy spreads over several temporary
+# arrays. difference is not overridden: the FFT form is O(N log N) while
+# a compiled loop is O(N * max_tau), which loses at tuner window sizes.
+# Stacked (2-D) inputs go to the reference kernels.
+
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _nb_cmnd(d):
+        out = np.empty_like(d)
+        running_sum = 0.0
+        for tau in range(len(d)):
+            running_sum += d[tau]
+            out[tau] = 1.0 if running_sum == 0 else d[tau] * tau / running_sum
+        return out
+
+    @numba.njit(cache=True)
+    def _nb_rms(x):
+        total = 0.0
+        for i in range(len(x)):
+            total += x[i] * x[i]
+        return np.sqrt(total / len(x))
+
+    @numba.njit(cache=True)
+    def _nb_decimate(x, taps, factor, skip):
+        L = len(taps)
+        n_out = max(0, (len(x) - L - skip) // factor + 1)
+        out = np.empty(n_out)
+        for k in range(n_out):
+            base = skip + k * factor
+            acc = 0.0
+            for j in range(L):
+                acc += x[base + j] * taps[j]
+            out[k] = acc
+        return out
+
+    @numba.njit(cache=True)
+    def _nb_wavetable(out, table, phase, increment, step, amplitude,
+                      amp_step, frac_bits):
+        frac_mask = (1 << frac_bits) - 1
+        scale = 1.0 / (1 << frac_bits)
+        for i in range(len(out)):
+            index = phase >> frac_bits
+            low = table[index]
+            frac = (phase & frac_mask) * scale
+            value = low + frac * (table[index + 1] - low)
+            out[i] += (amplitude + i * amp_step) * value
+            phase = (phase + increment) & 0xFFFFFFFF
+            increment += step
+        return phase
+
+    def _numba_cmnd(d):
+        if d.ndim != 1:
+            return _numpy_cmnd(d)
+        return _nb_cmnd(d)
+
+    def _numba_rms(x):
+        if x.ndim != 1:
+            return _numpy_rms(x)
+        return _nb_rms(x)
+
+    def _numba_decimate(x, taps, factor, skip=0):
+        if x.ndim != 1:
+            return _numpy_decimate(x, taps, factor, skip)
+        return _nb_decimate(x, taps, factor, skip)
+
+    def _numba_wavetable(out, table, phase, increment, step=0,
+                         amplitude=1.0, amp_step=0.0, workspace=None):
+        return _nb_wavetable(
+            out, table, int(phase), int(increment), int(step),
+            float(amplitude), float(amp_step), _table_frac_bits(table),
+        )
+
+    def _numba_warmup():
+        # Compile (or load from the cache) every specialization the
+        # callers use: frames and CMNDs in either float dtype, float64
+        # decimator input, float32 blocks over float32 tables, read-only
+        # as sine_table() makes them
+        for dtype in ("float32", "float64"):
+            x = np.zeros(16, dtype=dtype)
+            _nb_cmnd(x)
+            _nb_rms(x)
+            _nb_decimate(x, np.zeros(4), 2, 0)
+
+            table = np.zeros(9, dtype=dtype)
+            for writeable in (True, False):
+                table.flags.writeable = writeable
+                _numba_wavetable(np.zeros(4, dtype="float32"), table, 0, 1)
+
+    register_backend("numba", {
+        "cmnd": _numba_cmnd,
+        "rms": _numba_rms,
+        "decimate": _numba_decimate,
+        "wavetable": _numba_wavetable,
+    }, warmup=_numba_warmup)
+
+
+# -------------------------
+# Equivalence check
+
+
+def verify_backend(name, seed=0, tolerance=1e-7):
+    """
+    Run every kernel of backend name on random inputs (float32 and
+    float64, 1-D and stacked) and compare with the NumPy reference.
+
+    Returns {kernel: max relative error}; raises RuntimeError if any
+    kernel is off by more than tolerance (1e-5 for float32 inputs, which
+    a backend may accumulate in single precision).
+    """
+    previous = current_backend()
+    rng = np.random.default_rng(seed)
+
+    x = rng.standard_normal(2048)
+    frames = rng.standard_normal((4, 1024))
+    taps = rng.standard_normal(81)
+    table = np.sin(2 * np.pi * np.arange(2049) / 2048).astype("float32")
+
+    cases = {
+        "difference": [(x, 630), (frames, 300), (x.astype("float32"), 630)],
+        "cmnd": [(_numpy_difference(x, 630),), (rng.random((3, 500)),)],
+        "rms": [(x,), (frames,), (x.astype("float32"),)],
+        "decimate": [(x, taps, 4, 0), (x, taps, 5, 3), (frames, taps, 2, 1)],
+        "wavetable": [
+            (np.zeros(512), table, 123456789, 42852281, 0, 0.5, 0.0),
+            (x[:512].astype("float32"), table, 4 << 30, 9 << 24, -2500,
+             0.0, 1e-3),
+            # Steady sine with a workspace: NumPy rotates instead of
+            # looking up, so this is single-precision close only
+            (np.zeros(512, "float32"), table, 123456789, 42852281, 0,
+             0.5, 0.0, WavetableWorkspace(512, table)),
+        ],
+    }
+
+    errors = {}
+    failed = set()
+    try:
+        for kernel, arg_sets in cases.items():
+            worst = 0.0
+            for args in arg_sets:
+                results = []
+                for backend in ("numpy", name):
+                    use_backend(backend)
+                    # wavetable adds into its first argument and returns
+                    # the phase, compared here as a fraction of a cycle
+                    call_args = [
+                        a.copy() if isinstance(a, np.ndarray) else a
+                        for a in args
+                    ]
+                    value = _active[kernel](*call_args)
+                    if kernel == "wavetable":
+                        value = np.append(
+                            call_args[0], value / (PHASE_MASK + 1)
+                        )
+                    results.append(np.asarray(value, dtype=float))
+
+                expected, actual = results
+                if expected.shape != actual.shape:
+                    worst = np.inf
+                    failed.add(kernel)
+                    continue
+
+                scale = max(1.0, float(np.max(np.abs(expected))))
+                error = float(np.max(np.abs(actual - expected))) / scale
+                worst = max(worst, error)
+
+                single = args[0].dtype == np.float32
+                if error > (max(tolerance, 1e-5) if single else tolerance):
+                    failed.add(kernel)
+
+            errors[kernel] = worst
+    finally:
+        use_backend(previous)
+
+    if failed:
+        raise RuntimeError(
+            f"backend {name!r} differs from numpy: "
+            + ", ".join(f"{k} ({errors[k]:.2e})" for k in sorted(failed))
+        )
+
+    return errors
+
+
+# -------------------------
+
+
+def _default_backend():
+    requested = os.environ.get(BACKEND_ENV)
+    if requested:
+        if requested in _BACKENDS:
+            return requested
+        print(
+            f"{BACKEND_ENV}={requested!r} is not available "
+            f"(have {available_backends()}); using the default",
+            file=sys.stderr,
+        )
+
+    return "numba" if "numba" in _BACKENDS else "numpy"
+
+
+use_backend(_default_backend())
+
+
+if __name__ == "__main__":
+    for backend in available_backends():
+        errors = verify_backend(backend)
+        worst = max(errors.values())
+        print(f"{backend:8s} ok  (max relative error {worst:.2e})")
@@ -0,0 +1,190 @@
+import threading
+import traceback
+import numpy as np
+
+
+POLICIES = ("all", "latest")
+
+
+class BlockRingBuffer:
+    """
+    Single-producer / single-consumer ring of preallocated audio blocks.
+
+    Only the producer (the PortAudio callback) advances the write index and
+    only the consumer (the DSP worker) advances the read index, so neither
+    side takes a lock. When the ring is full new blocks are dropped and
+    counted rather than blocking the audio thread.
+
+    With channels > 1 each slot holds a (channels, blocksize) block.
+    """
+
+    def __init__(self, capacity, blocksize, channels=1):
+        self.capacity = capacity
+        self.blocksize = blocksize
+        self.channels = channels
+
+        self._blocks = np.zeros(
+            (capacity, channels, blocksize), dtype="float32"
+        )
+        self._lengths = np.zeros(capacity, dtype=np.int64)
+        self._starts = np.zeros(capacity, dtype=np.int64)
+
+        self._write_index = 0
+        self._read_index = 0
+
+        self.dropped = 0
+
+    def __len__(self):
+        return self._write_index - self._read_index
+
+    # -------------------------
+    # Producer side
+
+    def push(self, samples, start=0):
+        """
+        samples is 1-D for a single channel, or (frames, channels) as
+        PortAudio delivers interleaved input. start is the position of
+        its first sample on the caller's timeline (see peek_start()).
+        """
+        samples = samples.reshape(len(samples), -1)
+
+        # Blocks longer than a slot (variable-size callbacks) are split
+        for offset in range(0, len(samples), self.blocksize):
+            if len(self) >= self.capacity:
+                self.dropped += 1
+                continue
+
+            chunk = samples[offset:offset + self.blocksize]
+            slot = self._write_index % self.capacity
+            self._blocks[slot, :, :len(chunk)] = chunk.T
+            self._lengths[slot] = len(chunk)
+            self._starts[slot] = start + offset
+            self._write_index += 1
+
+    # -------------------------
+    # Consumer side
+
+    def peek(self):
+        """
+        The oldest queued block, as a view into the ring: 1-D for a single
+        channel, (channels, samples) otherwise. It stays valid until
+        advance() is called.
+        """
+        slot = self._read_index % self.capacity
+        block = self._blocks[slot, :, : self._lengths[slot]]
+        return block[0] if self.channels == 1 else block
+
+    def peek_start(self):
+        """
+        Timeline position of the oldest queued block's first sample.
+        """
+        return int(self._starts[self._read_index % self.capacity])
+
+    def advance(self):
+        self._read_index += 1
+
+    def skip_to_latest(self):
+        skipped = max(0, len(self) - 1)
+        self._read_index += skipped
+        return skipped
+
+
+class DSPWorker:
+    """
+    Runs analysis callbacks on a dedicated thread fed by a BlockRingBuffer.
+
+    policy:
+        "all"    process every queued block in order
+        "latest" discard any backlog and process only the newest block
+    """
+
+    def __init__(self, callback, blocksize, capacity=32, policy="all",
+                 channels=1):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}")
+
+        self.callback = callback
+        self.policy = policy
+        self.ring = BlockRingBuffer(capacity, blocksize, channels)
+
+        # Blocks discarded by the "latest" policy
+        self.skipped = 0
+
+        # Blocks whose callback raised; the worker reports the error and
+        # carries on with the next block
+        self.errors = 0
+        self._last_error = None
+
+        # Timeline position of the block the callback is handling (the
+        # start given to push())
+        self.block_start = 0
+
+        self.running = False
+        self._thread = None
+        self._wake = threading.Event()
+
+    # -------------------------
+
+    @property
+    def queue_depth(self):
+        return len(self.ring)
+
+    @property
+    def dropped(self):
+        return self.ring.dropped + self.skipped
+
+    # -------------------------
+
+    def push(self, samples, start=0):
+        """
+        Called from the audio thread: copy into the ring and wake the worker.
+        """
+        self.ring.push(samples, start)
+        self._wake.set()
+
+    def start(self):
+        if self.running:
+            return
+
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    # -------------------------
+
+    def _run(self):
+        while self.running:
+            self._wake.wait(0.1)
+            self._wake.clear()
+
+            while self.running and len(self.ring):
+                if self.policy == "latest":
+                    self.skipped += self.ring.skip_to_latest()
+
+                self.block_start = self.ring.peek_start()
+                try:
+                    self.callback(self.ring.peek())
+                except Exception as e:
+                    self._report(e)
+                finally:
+                    self.ring.advance()
+
+    def _report(self, error):
+        self.errors += 1
+
+        # A persistent fault raises on every block: print the traceback
+        # once per distinct error rather than dozens of times a second
+        key = (type(error), str(error))
+        if key != self._last_error:
+            self._last_error = key
+            print(f"DSP callback failed (block {self.block_start}):")
+            traceback.print_exception(
+                type(error), error, error.__traceback__
+            )
@@ -0,0 +1,71 @@
+import numpy as np
+
+
+class FrameRing:
+    """
+    Cuts a stream into window-sample frames every hop samples.
+
+    Samples are written twice, at pos and pos + window of a 2 * window
+    ring, so the latest frame is always the contiguous slice
+    ring[..., pos:pos + window] and never has to be stitched together
+    across the wrap. With channels given, blocks are (channels, samples)
+    and the ring keeps one row per channel.
+    """
+
+    def __init__(self, window, hop, channels=None, dtype="float32"):
+        if not 0 < hop <= window:
+            raise ValueError("hop must be between 1 and window")
+
+        self.window = window
+        self.hop = hop
+        self.channels = channels
+        self.frame_shape = (
+            (window,) if channels is None else (channels, window)
+        )
+        self._ring = np.zeros(
+            self.frame_shape[:-1] + (2 * window,), dtype=dtype
+        )
+        self.reset()
+
+    def reset(self):
+        self._ring.fill(0)
+        self._pos = 0
+        # The first frame needs a full window, later ones a hop each
+        self._pending = self.window
+
+    # -------------------------
+
+    def frames(self, block):
+        """
+        Write block (of any length) and yield the latest frame after every
+        hop it completes. Frames are views into the ring, valid only until
+        the generator resumes; consume it to the end, or the rest of the
+        block is not written.
+        """
+        length = block.shape[-1]
+        i = 0
+        while i < length:
+            n = min(length - i, self._pending)
+            self._write(block[..., i:i + n])
+            i += n
+
+            self._pending -= n
+            if self._pending == 0:
+                yield self._ring[..., self._pos:self._pos + self.window]
+                self._pending = self.hop
+
+    def _write(self, samples):
+        N = self.window
+        n = samples.shape[-1]
+        pos = self._pos
+        ring = self._ring
+
+        first = min(n, N - pos)
+        ring[..., pos:pos + first] = samples[..., :first]
+        ring[..., N + pos:N + pos + first] = samples[..., :first]
+
+        rest = n - first
+        ring[..., :rest] = samples[..., first:]
+        ring[..., N:N + rest] = samples[..., first:]
+
+        self._pos = (pos + n) % N
@@ -0,0 +1,335 @@
+import threading
+import time
+import numpy as np
+
+from core.mixer import shared_buffer
+
+
+# Probe: a Hann-windowed linear sweep. Its autocorrelation is a single
+# narrow peak, unlike a sine click whose correlation rings every cycle.
+CHIRP_SECONDS = 0.01
+CHIRP_BAND = (1000.0, 8000.0)
+
+# The first probe is queued this far ahead of the output clock, as the
+# metronome does with its clicks
+LEAD_SECONDS = 0.1
+
+# Trials whose normalised correlation peak falls below this are treated
+# as not found (no loopback, or buried in noise)
+MIN_CONFIDENCE = 0.5
+
+# SettingsManager keys of the calibration result
+SETTINGS_KEY = "latency_offset_ms"
+JITTER_KEY = "latency_jitter_ms"
+
+
+def chirp(sample_rate, seconds=CHIRP_SECONDS, band=CHIRP_BAND, level=0.5):
+    """
+    Windowed linear sweep over band (Hz), as a shared buffer.
+    """
+    n = int(sample_rate * seconds)
+    t = np.arange(n) / sample_rate
+    f0, f1 = band
+
+    phase = 2 * np.pi * (f0 * t + (f1 - f0) * t * t / (2 * seconds))
+    return shared_buffer(level * np.hanning(n) * np.sin(phase))
+
+
+def find_probe(signal, probe):
+    """
+    (offset, confidence): where probe starts in signal, to a fraction of
+    a sample, and the normalised cross-correlation there (1.0 for an
+    exact copy at any gain). A polarity-inverted copy is found as well.
+    """
+    if len(signal) < len(probe):
+        return None, 0.0
+
+    corr = np.abs(np.correlate(signal, probe, mode="valid"))
+    peak = int(np.argmax(corr))
+
+    window = signal[peak:peak + len(probe)]
+    energy = np.dot(window, window) * np.dot(probe, probe)
+    confidence = corr[peak] / np.sqrt(energy) if energy > 0 else 0.0
+
+    offset = float(peak)
+    if 0 < peak < len(corr) - 1:
+        s0, s1, s2 = corr[peak - 1:peak + 2]
+        denom = 2 * (2 * s1 - s2 - s0)
+        if denom:
+            offset += (s2 - s0) / denom
+
+    return offset, float(confidence)
+
+
+class LatencyCalibrator:
+    """
+    Measures the round trip from output to input of a duplex
+    AudioEngine.
+
+    The output has to reach the input: a loopback cable, the speaker
+    next to the microphone, or a VirtualLoopback. Each trial plays the
+    chirp on the mixer at a known output sample and looks for it in the
+    input by cross-correlation; as a duplex stream stamps input blocks
+    on the output timeline, the distance between the two is the round
+    trip in samples. Stop the metronome first, its clicks would land in
+    the search windows.
+
+    Probes are max_latency plus the chirp apart, so every trial's window
+    holds its own probe only.
+    """
+
+    def __init__(self, audio_engine, trials=10, max_latency=0.3,
+                 level=0.5):
+        if not audio_engine.duplex:
+            raise ValueError("latency calibration needs a duplex AudioEngine")
+
+        self.audio_engine = audio_engine
+        self.trials = max(1, trials)
+
+        sample_rate = audio_engine.samplerate
+        self.probe = chirp(sample_rate, level=level)
+        self.max_latency = int(max_latency * sample_rate)
+        self.lead = max(
+            int(LEAD_SECONDS * sample_rate), 2 * audio_engine.blocksize
+        )
+
+        self._blocks = []
+        self._from = 0
+        self._until = 0
+        self._ready = threading.Event()
+
+    # -------------------------
+
+    def run(self, timeout=None):
+        """
+        Play the trials and return latency_ms (mean round trip),
+        jitter_ms (standard deviation), min_ms and max_ms over the
+        trials found, the per-trial latencies_ms (None where the probe
+        was not found) and the failed count; the statistics are left out
+        if no trial found the probe. Blocks until the input has
+        caught up with the last trial; raises TimeoutError after
+        timeout seconds (default: twice the expected run time).
+        """
+        engine = self.audio_engine
+        sample_rate = engine.samplerate
+        spacing = self.max_latency + len(self.probe)
+
+        if timeout is None:
+            timeout = 2 * (self.lead + spacing * self.trials) / sample_rate
+            timeout += 1.0
+
+        input_active = engine.input_active
+        output_active = engine.output_active
+        previous = engine.input_callback
+
+        self._blocks = []
+        self._until = 0
+        self._ready.clear()
+        engine.register_input_callback(self._collect)
+        try:
+            engine.start_input_stream()
+            engine.start_output_stream()
+
+            late = engine.mixer.late
+            first = engine.output_sample + self.lead
+            onsets = [first + spacing * i for i in range(self.trials)]
+
+            self._from = first
+            self._until = onsets[-1] + spacing
+            queued = [engine.play_buffer(self.probe, at=at) for at in onsets]
+
+            if not self._ready.wait(timeout):
+                raise TimeoutError("no loopback input within the timeout")
+
+            # Entries are handed to the mixer in order and later probes
+            # start later, so only the first one can have been late
+            if engine.mixer.late > late:
+                queued[0] = False
+        finally:
+            engine.register_input_callback(previous)
+            if not output_active:
+                engine.stop_output_stream()
+            if not input_active:
+                engine.stop_input_stream()
+
+        latencies = []
+        for at, played in zip(onsets, queued):
+            found = None
+            segment = self._segment(at, at + spacing) if played else None
+            if segment is not None:
+                offset, confidence = find_probe(segment, self.probe)
+                if confidence >= MIN_CONFIDENCE:
+                    found = 1000 * offset / sample_rate
+            latencies.append(found)
+
+        return self._summary(latencies)
+
+    def _summary(self, latencies):
+        found = np.array([ms for ms in latencies if ms is not None])
+        summary = {
+            "latencies_ms": latencies,
+            "failed": len(latencies) - len(found),
+        }
+        if len(found):
+            summary.update(
+                latency_ms=float(found.mean()),
+                jitter_ms=float(found.std()),
+                min_ms=float(found.min()),
+                max_ms=float(found.max()),
+            )
+        return summary
+
+    # -------------------------
+    # DSP worker thread
+
+    def _collect(self, audio_block):
+        start = self.audio_engine.dsp_worker.block_start
+        if audio_block.ndim > 1:
+            audio_block = audio_block[0]
+
+        end = start + len(audio_block)
+        if end > self._from:
+            self._blocks.append((start, audio_block.copy()))
+        if self._until and end >= self._until:
+            self._ready.set()
+
+    def _segment(self, begin, end):
+        """
+        Input samples begin..end, or None if blocks in it were dropped.
+        """
+        out = np.zeros(end - begin, dtype="float32")
+        covered = 0
+
+        for start, block in self._blocks:
+            lo = max(begin, start)
+            hi = min(end, start + len(block))
+            if lo < hi:
+                out[lo - begin:hi - begin] = block[lo - start:hi - start]
+                covered += hi - lo
+
+        return out if covered >= len(out) else None
+
+
+def save_latency(settings, result):
+    """
+    Store a calibration result in a SettingsManager.
+    """
+    settings.set(SETTINGS_KEY, round(result["latency_ms"], 3))
+    settings.set(JITTER_KEY, round(result["jitter_ms"], 3))
+    settings.save()
+
+
+def load_latency(audio_engine, settings):
+    """
+    Apply a stored calibration to audio_engine.round_trip_latency.
+    """
+    latency_ms = settings.get(SETTINGS_KEY)
+    if latency_ms is not None:
+        audio_engine.round_trip_latency = round(
+            latency_ms * audio_engine.samplerate / 1000
+        )
+
+
+# -------------------------
+
+
+class VirtualLoopback:
+    """
+    Software stand-in for a duplex sounddevice stream whose output is
+    wired to its input, for calibrating without hardware.
+
+    start() installs it as the engine's duplex stream, closing one the
+    engine already has open, and runs the engine's duplex callback from
+    a thread at the block rate (speed times faster if given). Each
+    block's input is the output latency samples earlier, plus up to
+    jitter more samples chosen at random per block, scaled by gain with
+    optional white noise. latency has to be at least one block, as a
+    real device's is.
+    """
+
+    def __init__(self, audio_engine, latency, jitter=0, gain=1.0,
+                 noise=0.0, speed=1.0, seed=None):
+        if latency < audio_engine.blocksize:
+            raise ValueError("latency must be at least one block")
+        if not audio_engine.duplex:
+            raise ValueError("VirtualLoopback needs a duplex AudioEngine")
+
+        self.audio_engine = audio_engine
+        self.latency = latency
+        self.jitter = jitter
+        self.gain = gain
+        self.noise = noise
+        self.speed = speed
+
+        self._rng = np.random.default_rng(seed)
+        self._history = np.zeros(
+            latency + jitter + 2 * audio_engine.blocksize, dtype="float32"
+        )
+        self._written = 0
+
+        self.running = False
+        self._thread = None
+
+    # -------------------------
+
+    def start(self):
+        if self.running:
+            return
+
+        # Replace, don't leak, a stream the engine already has open: it
+        # would keep running the same callback next to this one
+        engine = self.audio_engine
+        if engine.duplex_stream is not None:
+            engine.stop_duplex_stream()
+
+        engine.duplex_stream = self
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def close(self):
+        pass
+
+    # -------------------------
+
+    def _run(self):
+        engine = self.audio_engine
+        frames = engine.blocksize
+        period = frames / engine.samplerate / self.speed
+
+        indata = np.zeros((frames, engine.channels), dtype="float32")
+        outdata = np.zeros((frames, 1), dtype="float32")
+
+        deadline = time.perf_counter()
+        while self.running:
+            delay = self.latency
+            if self.jitter:
+                delay += int(self._rng.integers(0, self.jitter + 1))
+
+            looped = self._read(self._written - delay, frames) * self.gain
+            if self.noise:
+                looped += self.noise * self._rng.standard_normal(frames)
+            indata[:] = looped[:, None]
+
+            engine._duplex_callback(indata, outdata, frames, None, None)
+            self._write(outdata[:, 0])
+
+            deadline += period
+            time.sleep(max(0.0, deadline - time.perf_counter()))
+
+    def _read(self, start, frames):
+        index = np.arange(start, start + frames)
+        out = self._history[index % len(self._history)]
+        out[index < 0] = 0
+        return out
+
+    def _write(self, samples):
+        index = np.arange(self._written, self._written + len(samples))
+        self._history[index % len(self._history)] = samples
+        self._written += len(samples)
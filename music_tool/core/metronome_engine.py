@@ -1,6 +1,13 @@
-import numpy as np
+from collections import deque
 import threading
-import time
+
+from core.beat_clock import BeatClock
+from core.pattern_cache import PatternCache, click_sound, metronome_sounds
+
+
+# Clicks are queued on the mixer this far ahead of the output clock. It
+# has to cover one output block plus the scheduler's wake-up latency.
+LOOKAHEAD_SECONDS = 0.1
 
 
 class MetronomeEngine:
@@ -15,47 +22,86 @@ class MetronomeEngine:
 
         self.beats_per_bar = 4
         self.note_value = 4
+        # Ticks per beat, and an optional cross-rhythm of that many even
+        # hits per bar (e.g. 3 against 4)
+        self.subdivision = 1
+        self.polyrhythm = None
 
         self.running = False
         self._thread = None
 
         self.sample_rate = self.audio_engine.samplerate
+        self.lookahead = max(
+            int(LOOKAHEAD_SECONDS * self.sample_rate),
+            2 * self.audio_engine.blocksize,
+        )
+
+        # Scheduler state: beats are counted from start(); _clock places
+        # beat _next_beat - _clock_beat, and is rebuilt from the last
+        # queued beat when the tempo settings change. _queued holds
+        # (onset, beat, is_primary, bpm) for beats awaiting callbacks and
+        # _bar the (buffer, onset) of the last bar given to the mixer.
+        self._clock = None
+        self._clock_beat = 0
+        self._next_beat = 0
+        self._queued = deque()
+        self._bar = None
+        self._dirty = False
+        self._tempo_dirty = False
+        self._wake = threading.Event()
 
         self.beat_callback = None
         self.tempo_callback = None
 
-        self.accent_click = self._generate_click(1600)
-        self.normal_click = self._generate_click(1000)
+        sounds = metronome_sounds(self.sample_rate)
+        self.accent_click = sounds["accent"]
+        self.normal_click = sounds["beat"]
+        self.patterns = PatternCache(self.sample_rate, sounds)
 
     # -------------------------
 
     def _generate_click(self, freq, duration=0.05):
-        t = np.linspace(0, duration, int(self.sample_rate * duration), False)
-        click = 0.6 * np.sin(2 * np.pi * freq * t)
-
-        fade_len = int(0.01 * self.sample_rate)
-        fade = np.linspace(1, 0, fade_len)
-        click[-fade_len:] *= fade
-
-        return click.astype("float32")
+        return click_sound(self.sample_rate, freq, duration)
 
     # -------------------------
 
     def set_bpm(self, bpm):
         self.bpm = max(1, bpm)
 
+        # The practice ramp owns the tempo while it runs
+        if not self.practice_mode:
+            self._reschedule(tempo=True)
+
     def set_time_signature(self, beats, note_value):
         self.beats_per_bar = max(1, beats)
         self.note_value = max(1, note_value)
+        self._reschedule()
+
+    def set_subdivision(self, ticks_per_beat):
+        self.subdivision = max(1, ticks_per_beat)
+        self._reschedule()
+
+    def set_polyrhythm(self, hits_per_bar):
+        self.polyrhythm = hits_per_bar or None
+        self._reschedule()
 
     def enable_practice_mode(self, start_bpm, end_bpm, duration_seconds):
         self.start_bpm = start_bpm
         self.end_bpm = end_bpm
         self.practice_duration = max(1, duration_seconds)
         self.practice_mode = True
+        self._reschedule(tempo=True)
 
     def disable_practice_mode(self):
         self.practice_mode = False
+        self._reschedule(tempo=True)
+
+    def _reschedule(self, tempo=False):
+        # Beats within the lookahead keep their place; the rest follow
+        # the new settings from the scheduler's next wake-up
+        self._tempo_dirty = self._tempo_dirty or tempo
+        self._dirty = True
+        self._wake.set()
 
     def register_beat_callback(self, callback):
         self.beat_callback = callback
@@ -72,6 +118,18 @@ class MetronomeEngine:
         self.running = True
         self.audio_engine.start_output_stream()
 
+        # First beat one lookahead from now, so it is never late
+        self._clock = self._make_clock(
+            self.audio_engine.output_sample + self.lookahead
+        )
+        self._clock_beat = 0
+        self._next_beat = 0
+        self._queued.clear()
+        self._bar = None
+        self._dirty = False
+        self._tempo_dirty = False
+        self._wake.clear()
+
         self._thread = threading.Thread(
             target=self._run,
             daemon=True
@@ -80,44 +138,138 @@ class MetronomeEngine:
 
     def stop(self):
         self.running = False
+        self._wake.set()
         if self._thread:
             self._thread.join()
             self._thread = None
 
+        # The mixer holds the rest of the bar as one voice; cut it here
+        # rather than letting its remaining clicks play out
+        if self._bar:
+            buffer, start = self._bar
+            self.audio_engine.mixer.stop(
+                buffer, start, self.audio_engine.output_sample
+            )
+        self._queued.clear()
+        self._bar = None
+
     # -------------------------
 
+    def _make_clock(self, origin):
+        if self.practice_mode:
+            return BeatClock(
+                self.sample_rate,
+                self.start_bpm,
+                self.end_bpm,
+                self.practice_duration,
+                origin=origin,
+            )
+        return BeatClock(self.sample_rate, self.bpm, origin=origin)
+
+    def _rebase(self, now):
+        # Take back the beats past the lookahead: the bar holding them is
+        # cut at the first one, and scheduling resumes from there
+        horizon = now + self.lookahead
+        kept = deque(entry for entry in self._queued if entry[0] < horizon)
+
+        if len(kept) < len(self._queued):
+            cut_onset, cut_beat = self._queued[len(kept)][:2]
+            buffer, start = self._bar
+            self.audio_engine.mixer.stop(buffer, start, cut_onset)
+            self._queued = kept
+            self._next_beat = cut_beat
+
+        if self._tempo_dirty:
+            self._tempo_dirty = False
+
+            # Restart the clock on the last beat that stays
+            anchor = max(0, self._next_beat - 1)
+            origin = self._clock.sample_of(anchor - self._clock_beat)
+            self._clock = self._make_clock(origin)
+            self._clock_beat = anchor
+
+    def _queue_bar(self, beat, onset):
+        """
+        Hand the mixer the rest of the bar starting at clock beat beat:
+        the cached buffer for a whole bar at a steady tempo, otherwise a
+        freshly rendered one (ramps, or a bar cut by a change).
+        """
+        clock = self._clock
+        position = self._next_beat % self.beats_per_bar
+        bar_beat = beat - position
+
+        if position == 0 and clock.is_steady(beat):
+            buffer = self.patterns.bar(
+                clock.end_bpm,
+                self.beats_per_bar,
+                self.note_value,
+                self.subdivision,
+                self.polyrhythm,
+            )
+        else:
+            buffer = self.patterns.render(
+                clock,
+                bar_beat,
+                self.beats_per_bar,
+                self.subdivision,
+                self.polyrhythm,
+                from_beat=position,
+            )
+
+        self.audio_engine.play_buffer(buffer, at=onset)
+        self._bar = (buffer, onset)
+
+        for index in range(position, self.beats_per_bar):
+            self._queued.append((
+                clock.sample_of(bar_beat + index),
+                self._next_beat,
+                index == 0,
+                clock.tempo_of(bar_beat + index),
+            ))
+            self._next_beat += 1
+
     def _run(self):
-        next_time = time.perf_counter()
-        beat_index = 0
-        practice_start_time = time.perf_counter()
+        """
+        Give the mixer each bar at its exact onset sample, one lookahead
+        ahead of the output clock, and run the beat and tempo callbacks
+        once the output reaches each beat. In between the thread sleeps.
+        """
+        engine = self.audio_engine
+        queued = self._queued
 
         while self.running:
-            now = time.perf_counter()
+            now = engine.output_sample
 
-            if self.practice_mode:
-                elapsed = now - practice_start_time
-                progress = min(1.0, elapsed / self.practice_duration)
-                self.bpm = self.start_bpm + progress * (
-                    self.end_bpm - self.start_bpm
-                )
+            if self._dirty:
+                self._dirty = False
+                self._rebase(now)
+                queued = self._queued
 
-            interval = 60.0 / self.bpm
+            while True:
+                beat = self._next_beat - self._clock_beat
+                onset = self._clock.sample_of(beat)
+                if onset >= now + self.lookahead:
+                    break
+                self._queue_bar(beat, onset)
 
-            if now >= next_time:
-                is_primary = (beat_index % self.beats_per_bar) == 0
+            while queued and queued[0][0] <= now:
+                _, _, is_primary, bpm = queued.popleft()
 
-                if is_primary:
-                    self.audio_engine.play_buffer(self.accent_click)
-                else:
-                    self.audio_engine.play_buffer(self.normal_click)
+                if self.practice_mode:
+                    self.bpm = bpm
 
                 if self.beat_callback:
                     self.beat_callback(is_primary)
 
                 if self.tempo_callback:
-                    self.tempo_callback(self.bpm)
+                    self.tempo_callback(bpm)
 
-                beat_index += 1
-                next_time += interval
+            # The output clock moves a block at a time, so waking more
+            # often than every half block gains nothing
+            due = onset - self.lookahead
+            if queued:
+                due = min(due, queued[0][0])
+            wait = max(due - now, engine.blocksize // 2)
 
-            time.sleep(0.0005)
\ No newline at end of file
+            self._wake.wait(wait / self.sample_rate)
+            self._wake.clear()
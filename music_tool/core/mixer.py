@@ -0,0 +1,215 @@
+from collections import deque
+import numpy as np
+
+
+OVERFLOW_POLICIES = ("reject", "drop_oldest")
+
+
+def shared_buffer(samples):
+    """
+    Read-only float32 copy of samples for scheduling on a Mixer. Voices
+    keep a reference rather than a copy, so a buffer prepared once (e.g.
+    a metronome click) can be played any number of times for free.
+    Buffers that are already shared are returned as they are.
+    """
+    if (
+        isinstance(samples, np.ndarray)
+        and samples.dtype == np.float32
+        and samples.ndim == 1
+        and not samples.flags.writeable
+    ):
+        return samples
+
+    buffer = np.array(samples, dtype="float32").ravel()
+    buffer.flags.writeable = False
+    return buffer
+
+
+class Mixer:
+    """
+    Mixes scheduled sample buffers into the output stream.
+
+    play() may be called from any thread: it appends (buffer, start,
+    gain) to a deque, whose append/popleft are atomic, so it never takes
+    a lock shared with the audio thread. render() runs in the output
+    callback: it moves scheduled entries into a fixed table of
+    max_voices voices and adds every voice that overlaps the block into a
+    preallocated float32 block. Nothing is copied or allocated per click.
+
+    Times are in output samples: clock counts the samples rendered so
+    far, and a voice starts on the exact sample given by play(at=...).
+    Entries wait in the backlog while all voices are busy; once it holds
+    max_pending entries, overflow decides whether the new entry is
+    rejected ("reject") or the oldest queued one is dropped
+    ("drop_oldest"). Either way dropped is incremented.
+    """
+
+    def __init__(self, blocksize, max_voices=32, max_pending=64,
+                 overflow="reject"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+
+        self.max_voices = max_voices
+        self.max_pending = max_pending
+        self.overflow = overflow
+
+        # Voice table: parallel lists indexed by slot; a None buffer is a
+        # free slot
+        self._buffers = [None] * max_voices
+        self._starts = [0] * max_voices
+        self._ends = [0] * max_voices
+        self._gains = [1.0] * max_voices
+        self._active = 0
+
+        self._pending = deque()
+        self._stops = deque()
+
+        self._block = np.zeros(blocksize, dtype="float32")
+        self._scratch = np.zeros(blocksize, dtype="float32")
+
+        self.clock = 0
+        self.dropped = 0
+        # Entries that reached the table after their start time and were
+        # moved to the start of the next block
+        self.late = 0
+
+    @property
+    def active_voices(self):
+        return self._active
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    # -------------------------
+    # Any thread
+
+    def play(self, buffer, at=None, gain=1.0):
+        """
+        Schedule buffer to start at output sample at (default: the start
+        of the next rendered block). Returns False if it was rejected.
+        """
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            if self.overflow == "reject":
+                return False
+            try:
+                self._pending.popleft()
+            except IndexError:
+                pass
+
+        self._pending.append((shared_buffer(buffer), at, gain))
+        return True
+
+    def stop(self, buffer, start, at):
+        """
+        Cut the voice playing buffer from output sample start short at
+        output sample at (e.g. the rest of a bar after a tempo change).
+        """
+        self._stops.append((buffer, start, at))
+
+    def clear(self):
+        """
+        Cancel queued entries. Voices already sounding play out.
+        """
+        self._pending.clear()
+
+    # -------------------------
+    # Audio thread
+
+    def render(self, frames):
+        """
+        Mix the next frames samples. Returns a view into the preallocated
+        block, valid until the next call.
+        """
+        if frames > len(self._block):
+            # Only for callbacks larger than the configured blocksize
+            self._block = np.zeros(frames, dtype="float32")
+            self._scratch = np.zeros(frames, dtype="float32")
+
+        block = self._block[:frames]
+        block.fill(0)
+
+        self._take_pending()
+        if self._stops:
+            self._take_stops()
+
+        clock = self.clock
+        end = clock + frames
+
+        if self._active:
+            for slot in range(self.max_voices):
+                buffer = self._buffers[slot]
+                if buffer is None:
+                    continue
+
+                start = self._starts[slot]
+                if start >= end:
+                    continue
+
+                dst = max(0, start - clock)
+                src = clock + dst - start
+                n = min(frames - dst, self._ends[slot] - start - src)
+
+                gain = self._gains[slot]
+                if gain == 1.0:
+                    block[dst:dst + n] += buffer[src:src + n]
+                else:
+                    scaled = self._scratch[:n]
+                    np.multiply(buffer[src:src + n], gain, out=scaled)
+                    block[dst:dst + n] += scaled
+
+                if start + src + n >= self._ends[slot]:
+                    self._buffers[slot] = None
+                    self._active -= 1
+
+        self.clock = end
+        return block
+
+    def skip(self, frames):
+        """
+        Advance the clock without rendering, while nothing is played
+        (e.g. a duplex stream with only its input side in use).
+        """
+        self.clock += frames
+
+    def _take_pending(self):
+        slot = 0
+        while self._pending and self._active < self.max_voices:
+            buffer, start, gain = self._pending.popleft()
+
+            if start is None:
+                start = self.clock
+            elif start < self.clock:
+                self.late += 1
+                start = self.clock
+
+            while self._buffers[slot] is not None:
+                slot += 1
+
+            self._buffers[slot] = buffer
+            self._starts[slot] = start
+            self._ends[slot] = start + len(buffer)
+            self._gains[slot] = gain
+            self._active += 1
+
+    def _take_stops(self):
+        while self._stops:
+            buffer, start, at = self._stops.popleft()
+            for slot in range(self.max_voices):
+                if (
+                    self._buffers[slot] is buffer
+                    and self._starts[slot] == start
+                    and at < self._ends[slot]
+                ):
+                    self._ends[slot] = max(at, start, self.clock)
+
+    def reset(self):
+        """
+        Silence every voice and cancel the backlog (the clock keeps
+        running).
+        """
+        self._pending.clear()
+        for slot in range(self.max_voices):
+            self._buffers[slot] = None
+        self._active = 0
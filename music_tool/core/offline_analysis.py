@@ -0,0 +1,100 @@
+import csv
+import numpy as np
+
+from utils.note_utils import frequencies_to_notes
+
+
+TRACK_DTYPE = np.dtype([
+    ("time", "f8"),
+    ("frequency", "f8"),
+    ("note", "U4"),
+    ("cents", "f8"),
+])
+
+
+def frame_count(n_samples, buffer_size, hop_size):
+    if n_samples < buffer_size:
+        return 0
+    return 1 + (n_samples - buffer_size) // hop_size
+
+
+def analyze_frames(reader, tuner, hop_size, first_frame, last_frame):
+    """
+    Pitch-track frames [first_frame, last_frame) of a WavReader.
+
+    Frame k covers samples [k * hop_size, k * hop_size + buffer_size), so
+    any split of the frame range gives exactly the frames of a single pass.
+
+    Returns:
+        times (frame centres, seconds)
+        frequencies (NaN where unvoiced)
+    """
+    if last_frame <= first_frame:
+        return np.zeros(0), np.zeros(0)
+
+    start = first_frame * hop_size
+    stop = (last_frame - 1) * hop_size + tuner.buffer_size
+
+    frequencies, _ = tuner.process_batch(
+        reader.read(start, stop), hop_size
+    )
+
+    centres = np.arange(first_frame, last_frame) * hop_size
+    times = (centres + tuner.buffer_size / 2) / reader.sample_rate
+    return times, frequencies
+
+
+def track_file(reader, tuner, hop_size=512, chunk_seconds=30.0):
+    """
+    Generator over (times, frequencies) chunks for a whole file, reading
+    about chunk_seconds of audio (plus the window overlap) at a time.
+    """
+    total = frame_count(reader.frames, tuner.buffer_size, hop_size)
+    per_chunk = max(1, int(chunk_seconds * reader.sample_rate) // hop_size)
+
+    for first in range(0, total, per_chunk):
+        last = min(total, first + per_chunk)
+        yield analyze_frames(reader, tuner, hop_size, first, last)
+
+
+def to_track(times, frequencies, a4=440.0):
+    track = np.zeros(len(times), dtype=TRACK_DTYPE)
+    track["time"] = times
+    track["frequency"] = frequencies
+    track["note"], _, track["cents"] = frequencies_to_notes(frequencies, a4)
+    return track
+
+
+# -------------------------
+
+
+def write_csv(path, chunks, a4=440.0):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["time", "frequency", "note", "cents"])
+
+        for times, frequencies in chunks:
+            for row in to_track(times, frequencies, a4):
+                if row["note"]:
+                    writer.writerow([
+                        f"{row['time']:.4f}",
+                        f"{row['frequency']:.3f}",
+                        row["note"],
+                        f"{row['cents']:.2f}",
+                    ])
+                else:
+                    writer.writerow([f"{row['time']:.4f}", "", "", ""])
+
+
+def write_npy(path, chunks, n_frames, a4=440.0):
+    out = np.lib.format.open_memmap(
+        path, mode="w+", dtype=TRACK_DTYPE, shape=(n_frames,)
+    )
+
+    pos = 0
+    for times, frequencies in chunks:
+        out[pos:pos + len(times)] = to_track(times, frequencies, a4)
+        pos += len(times)
+
+    out.flush()
+    del out
@@ -0,0 +1,186 @@
+import numpy as np
+
+from core import dsp_utils
+
+
+# log2 of the sine table length; linear interpolation keeps the error
+# around 1e-6 (-120 dB)
+TABLE_BITS = 11
+
+# Default time for frequency and amplitude changes to settle
+RAMP_SECONDS = 0.01
+
+
+def sine_table(bits=TABLE_BITS):
+    """
+    One sine cycle of 2 ** bits samples plus a guard sample, read-only
+    (the layout dsp_utils.wavetable expects).
+    """
+    size = 1 << bits
+    table = np.sin(2 * np.pi * np.arange(size + 1) / size).astype("float32")
+    table[size] = table[0]
+    table.flags.writeable = False
+    return table
+
+
+class Oscillator:
+    """
+    Bank of wavetable voices (reference tone, chords, drones).
+
+    Each voice is a 32-bit phase accumulator reading a shared sine table.
+    set_voice() can be called from any thread: it replaces the voice's
+    (frequency, amplitude) target in one assignment, and render() picks
+    it up on the audio thread and ramps both linearly over ramp_time, so
+    note and volume changes never jump. A voice starting from silence
+    takes the new frequency at once and only fades in.
+
+    render() writes into a preallocated float32 block and the kernel
+    into per-voice workspaces, so nothing is allocated per block; voices
+    at zero amplitude cost nothing.
+    """
+
+    def __init__(self, samplerate, blocksize, voices=4,
+                 ramp_time=RAMP_SECONDS, table=None):
+        self.samplerate = samplerate
+        self.voices = voices
+        self.ramp_samples = max(1, int(ramp_time * samplerate))
+        self.table = sine_table() if table is None else table
+
+        self._block = np.zeros(blocksize, dtype="float32")
+
+        # Kernel scratch, one per voice as it also caches the voice's
+        # steady-state rotation (see dsp_utils.WavetableWorkspace)
+        self._workspaces = [
+            dsp_utils.WavetableWorkspace(blocksize, self.table)
+            for _ in range(voices)
+        ]
+
+        # Written by set_voice(); one (frequency, amplitude) tuple per voice
+        self._targets = [(0.0, 0.0)] * voices
+
+        # Audio thread state
+        self._applied = list(self._targets)
+        self._phase = [0] * voices
+        self._increment = [0] * voices
+        self._amplitude = [0.0] * voices
+        self._target_increment = [0] * voices
+        self._step = [0] * voices
+        self._amp_step = [0.0] * voices
+        self._ramp_left = [0] * voices
+
+        self._warm()
+
+    def _warm(self):
+        # Run the kernel once on this table, ramped and steady, so a JIT
+        # backend has compiled it for these types before the stream
+        # starts rather than in the first render()
+        scratch = np.zeros(4, dtype="float32")
+        dsp_utils.wavetable(scratch, self.table, 0, 1 << 24, 1, 0.0, 0.1)
+        dsp_utils.wavetable(scratch, self.table, 0, 1 << 24, 0, 0.5, 0.0)
+
+    # -------------------------
+    # Any thread
+
+    def set_voice(self, voice, frequency, amplitude):
+        target = (float(frequency), float(amplitude))
+
+        # An unchanged target would restart the ramp (and leave the
+        # steady-state path for a block)
+        if target != self._targets[voice]:
+            self._targets[voice] = target
+
+    def silence(self, voice=None):
+        """
+        Fade out one voice, or all of them.
+        """
+        for v in range(self.voices) if voice is None else (voice,):
+            self.set_voice(v, self._targets[v][0], 0.0)
+
+    @property
+    def active(self):
+        return any(amplitude for _, amplitude in self._targets) or any(
+            self._amplitude
+        )
+
+    # -------------------------
+    # Audio thread
+
+    def render(self, frames):
+        """
+        The next frames samples of all voices, as a view into the
+        preallocated block (valid until the next call).
+        """
+        if frames > len(self._block):
+            # Only for callbacks larger than the configured blocksize
+            self._block = np.zeros(frames, dtype="float32")
+
+        block = self._block[:frames]
+        block.fill(0)
+
+        for voice in range(self.voices):
+            target = self._targets[voice]
+            if target is not self._applied[voice]:
+                self._start_ramp(voice, target)
+
+            if self._ramp_left[voice]:
+                n = min(frames, self._ramp_left[voice])
+                self._segment(voice, block[:n], ramp=True)
+                self._ramp_left[voice] -= n
+
+                if not self._ramp_left[voice]:
+                    # Land exactly on the target despite step rounding
+                    self._increment[voice] = self._target_increment[voice]
+                    self._amplitude[voice] = target[1]
+            else:
+                n = 0
+
+            if n < frames and self._amplitude[voice]:
+                self._segment(voice, block[n:], ramp=False)
+
+        return block
+
+    def _start_ramp(self, voice, target):
+        self._applied[voice] = target
+        frequency, amplitude = target
+
+        nyquist = self.samplerate / 2
+        increment = round(
+            min(max(frequency, 0.0), nyquist) / self.samplerate * 2 ** 32
+        )
+        self._target_increment[voice] = increment
+
+        if not self._amplitude[voice]:
+            self._increment[voice] = increment
+
+        n = self.ramp_samples
+        self._step[voice] = round((increment - self._increment[voice]) / n)
+        self._amp_step[voice] = (amplitude - self._amplitude[voice]) / n
+        self._ramp_left[voice] = n
+
+    def _segment(self, voice, out, ramp):
+        step = self._step[voice] if ramp else 0
+        amp_step = self._amp_step[voice] if ramp else 0.0
+
+        self._phase[voice] = dsp_utils.wavetable(
+            out,
+            self.table,
+            self._phase[voice],
+            self._increment[voice],
+            step,
+            self._amplitude[voice],
+            amp_step,
+            self._workspaces[voice],
+        )
+
+        n = len(out)
+        self._increment[voice] += step * n
+        self._amplitude[voice] += amp_step * n
+
+    def reset(self):
+        """
+        Silence every voice immediately (no fade).
+        """
+        self._targets = [(0.0, 0.0)] * self.voices
+        self._applied = list(self._targets)
+        self._amplitude = [0.0] * self.voices
+        self._ramp_left = [0] * self.voices
@@ -0,0 +1,163 @@
+from collections import OrderedDict
+import numpy as np
+
+from core.beat_clock import BeatClock
+from core.mixer import shared_buffer
+
+
+# Rendered bars kept by default; a 4/4 bar at 40 BPM is about 1 MB
+DEFAULT_MAX_BYTES = 16 << 20
+
+# Sounds a bar is built from
+SOUNDS = ("accent", "beat", "sub", "poly")
+
+
+def click_sound(sample_rate, freq, duration=0.05, level=0.6):
+    """
+    Sine click with a 10 ms fade-out, as a shared buffer.
+    """
+    t = np.linspace(0, duration, int(sample_rate * duration), False)
+    click = level * np.sin(2 * np.pi * freq * t)
+
+    fade_len = int(0.01 * sample_rate)
+    fade = np.linspace(1, 0, fade_len)
+    click[-fade_len:] *= fade
+
+    # Shared with the mixer's voices, so it is converted only once
+    return shared_buffer(click)
+
+
+def metronome_sounds(sample_rate):
+    """
+    The metronome's click set, keyed by the names in SOUNDS.
+    """
+    return {
+        "accent": click_sound(sample_rate, 1600),
+        "beat": click_sound(sample_rate, 1000),
+        "sub": click_sound(sample_rate, 1000, level=0.24),
+        "poly": click_sound(sample_rate, 2400, level=0.36),
+    }
+
+
+def bar_events(beats_per_bar, subdivision=1, polyrhythm=None):
+    """
+    (position in beats, sound) for one bar, sorted by position: the
+    accent on beat 0, plain beats, subdivision ticks between beats, and
+    polyrhythm hits dividing the bar evenly into that many pulses.
+    """
+    events = []
+    for beat in range(beats_per_bar):
+        events.append((beat, "accent" if beat == 0 else "beat"))
+        for tick in range(1, subdivision):
+            events.append((beat + tick / subdivision, "sub"))
+
+    if polyrhythm:
+        for hit in range(polyrhythm):
+            events.append((hit * beats_per_bar / polyrhythm, "poly"))
+
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+class PatternCache:
+    """
+    Whole metronome bars rendered into single buffers.
+
+    At a steady tempo a bar depends only on (bpm, signature,
+    subdivision, polyrhythm, sample rate), so it is rendered once and
+    kept in an LRU capped at max_bytes; the metronome then hands the
+    mixer one shared buffer per bar. Bars whose tempo changes inside
+    (practice ramps) are rendered from the BeatClock on demand by
+    render() and not cached.
+
+    sounds maps each name in SOUNDS to a click buffer; "sub" and "poly"
+    default to the plain beat at half level.
+    """
+
+    def __init__(self, sample_rate, sounds, max_bytes=DEFAULT_MAX_BYTES):
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+
+        beat = np.asarray(sounds["beat"], dtype="float32")
+        self.sounds = {
+            "accent": sounds["accent"],
+            "beat": beat,
+            "sub": sounds.get("sub", 0.5 * beat),
+            "poly": sounds.get("poly", 0.5 * beat),
+        }
+        self._tail = max(len(sound) for sound in self.sounds.values())
+
+        self._bars = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    # -------------------------
+
+    def bar(self, bpm, beats_per_bar, note_value=4, subdivision=1,
+            polyrhythm=None):
+        """
+        The shared, read-only buffer for one bar at a steady tempo,
+        starting at its first beat's onset (click tails run past the
+        bar's end).
+        """
+        key = (
+            bpm,
+            (beats_per_bar, note_value),
+            subdivision,
+            polyrhythm,
+            self.sample_rate,
+        )
+
+        buffer = self._bars.get(key)
+        if buffer is not None:
+            self._bars.move_to_end(key)
+            self.hits += 1
+            return buffer
+
+        self.misses += 1
+        buffer = self.render(
+            BeatClock(self.sample_rate, bpm),
+            0,
+            beats_per_bar,
+            subdivision,
+            polyrhythm,
+        )
+
+        self._bars[key] = buffer
+        self.nbytes += buffer.nbytes
+        while self.nbytes > self.max_bytes and len(self._bars) > 1:
+            _, evicted = self._bars.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+        return buffer
+
+    def render(self, clock, bar_beat, beats_per_bar, subdivision=1,
+               polyrhythm=None, from_beat=0):
+        """
+        Render the bar whose first beat is clock beat bar_beat, from bar
+        position from_beat on (to finish a bar after a tempo change).
+        The buffer starts at the onset of from_beat.
+        """
+        events = [
+            (position, sound)
+            for position, sound in bar_events(
+                beats_per_bar, subdivision, polyrhythm
+            )
+            if position >= from_beat
+        ]
+
+        start = clock.sample_of(bar_beat + from_beat)
+        end = clock.sample_of(bar_beat + beats_per_bar)
+
+        out = np.zeros(max(0, end - start) + self._tail, dtype="float32")
+        for position, sound in events:
+            click = self.sounds[sound]
+            offset = clock.sample_of(bar_beat + position) - start
+            out[offset:offset + len(click)] += click
+
+        return shared_buffer(out)
+
+    def clear(self):
+        self._bars.clear()
+        self.nbytes = 0
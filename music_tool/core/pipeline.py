@@ -0,0 +1,376 @@
+import copy
+import time
+import numpy as np
+
+from core import dsp_utils
+from core.decimator import Decimator
+from core.frame_ring import FrameRing
+from core.smoothing import RunningMedian
+from core.tuner_engine import TunerEngine, SILENCE_RMS
+from utils.note_utils import frequency_to_note, frequencies_to_notes
+
+
+class Stage:
+    """
+    One step of a Pipeline.
+
+    process() takes the previous stage's output and returns its own, or
+    None to stop this item here (e.g. a gated frame). A stage with
+    splits = True returns a list instead, and every element continues
+    through the rest of the pipeline on its own (used by Framer, which
+    turns device blocks into analysis frames).
+
+    The pipeline fills in calls, total_ns and max_ns.
+    """
+
+    name = "stage"
+    splits = False
+
+    def __init__(self):
+        self.reset_stats()
+
+    def process(self, item):
+        return item
+
+    def reset(self):
+        pass
+
+    def reset_stats(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+
+class Pipeline:
+    """
+    Ordered list of stages with per-stage wall-time and call counts.
+
+    Stages can be inserted, removed or swapped in stages (or through
+    replace()) between blocks; their buffers are their own, so nothing
+    else needs rebuilding.
+    """
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+
+    # -------------------------
+
+    def process(self, block):
+        """
+        Run one input block through the pipeline. Returns the final
+        outputs (zero or more, depending on framing and gating).
+        """
+        results = []
+        self._run(0, block, results)
+        return results
+
+    def _run(self, index, item, results):
+        while index < len(self.stages):
+            stage = self.stages[index]
+
+            start = time.perf_counter_ns()
+            item = stage.process(item)
+            elapsed = time.perf_counter_ns() - start
+
+            stage.calls += 1
+            stage.total_ns += elapsed
+            if elapsed > stage.max_ns:
+                stage.max_ns = elapsed
+
+            index += 1
+            if item is None:
+                return
+
+            if stage.splits:
+                for part in item:
+                    self._run(index, part, results)
+                return
+
+        results.append(item)
+
+    # -------------------------
+
+    def get(self, name):
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    def replace(self, name, stage):
+        index = self.stages.index(self.get(name))
+        self.stages[index] = stage
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+
+    # -------------------------
+
+    def stats(self):
+        """
+        Per-stage timing, in pipeline order:
+            {name: {"calls", "total_ms", "mean_us", "max_us"}}
+        """
+        return {
+            stage.name: {
+                "calls": stage.calls,
+                "total_ms": stage.total_ns / 1e6,
+                "mean_us": stage.total_ns / 1e3 / max(1, stage.calls),
+                "max_us": stage.max_ns / 1e3,
+            }
+            for stage in self.stages
+        }
+
+    def reset_stats(self):
+        for stage in self.stages:
+            stage.reset_stats()
+
+
+# -------------------------
+# Block stages
+
+
+class Decimate(Stage):
+    """
+    Anti-aliased decimation of the incoming stream (see Decimator).
+    """
+
+    name = "decimate"
+
+    def __init__(self, factor):
+        super().__init__()
+        self.decimator = Decimator(factor)
+
+    def process(self, block):
+        return self.decimator.process(block)
+
+    def reset(self):
+        self.decimator.reset()
+
+
+class Framer(Stage):
+    """
+    Cuts the stream into buffer_size frames every hop_size samples (see
+    FrameRing). Blocks may be 1-D or (channels, samples); a change in
+    the channel count starts a new ring.
+
+    Since one block can complete several hops, each frame is copied out
+    to a preallocated row (later writes would overwrite a view); the rows
+    stay valid until the next block.
+    """
+
+    name = "framer"
+    splits = True
+
+    def __init__(self, buffer_size, hop_size):
+        super().__init__()
+        self.buffer_size = buffer_size
+        self.hop_size = hop_size
+        self._ring = FrameRing(buffer_size, hop_size)
+        self._frames = np.zeros((0, buffer_size), dtype="float32")
+
+    def process(self, block):
+        channels = block.shape[0] if block.ndim == 2 else None
+        if channels != self._ring.channels:
+            self._ring = FrameRing(self.buffer_size, self.hop_size, channels)
+
+        max_frames = block.shape[-1] // self.hop_size + 1
+        shape = self._ring.frame_shape
+        if len(self._frames) < max_frames or self._frames.shape[1:] != shape:
+            self._frames = np.zeros((max_frames,) + shape, dtype="float32")
+
+        count = 0
+        for frame in self._ring.frames(block):
+            self._frames[count] = frame
+            count += 1
+
+        return self._frames[:count]
+
+    def reset(self):
+        self._ring.reset()
+
+
+# -------------------------
+# Frame stages
+
+
+class RemoveDC(Stage):
+    """
+    Subtracts the frame mean (per channel for a (channels, samples)
+    frame) into a preallocated buffer, which later stages then work on
+    (the framer's ring is left untouched).
+    """
+
+    name = "dc"
+
+    def __init__(self, buffer_size, dtype="float64"):
+        super().__init__()
+        self._frame = np.zeros(buffer_size, dtype=dtype)
+
+    def process(self, frame):
+        if self._frame.shape != frame.shape:
+            self._frame = np.zeros(frame.shape, dtype=self._frame.dtype)
+
+        np.copyto(self._frame, frame, casting="unsafe")
+        self._frame -= self._frame.mean(axis=-1, keepdims=True)
+        return self._frame
+
+
+class NoiseGate(Stage):
+    """
+    Drops frames below threshold RMS. Given the detector's tuner, a
+    dropped frame also ends its period tracking, as TunerEngine.process()
+    does on silence (the detector never sees the frame).
+
+    A (channels, samples) frame is only dropped when every channel is
+    below threshold; the detector gates the channels one by one.
+    """
+
+    name = "gate"
+
+    def __init__(self, threshold=SILENCE_RMS, tuner=None):
+        super().__init__()
+        self.threshold = threshold
+        self.tuner = tuner
+
+    def process(self, frame):
+        level = dsp_utils.rms(frame)
+        if frame.ndim > 1:
+            level = level.max()
+
+        if level < self.threshold:
+            if self.tuner:
+                self.tuner.forget_track()
+            return None
+        return frame
+
+
+class Detector(Stage):
+    """
+    Frame -> frequency with a TunerEngine (see TunerEngine.detect); a
+    (channels, samples) frame gives per-channel frequencies.
+    """
+
+    name = "detector"
+
+    def __init__(self, tuner):
+        super().__init__()
+        self.tuner = tuner
+
+    def process(self, frame):
+        return self.tuner.detect(frame)
+
+    def reset(self):
+        self.tuner.reset_tracking()
+
+
+# -------------------------
+# Value stages
+
+
+class Smooth(Stage):
+    """
+    Runs a core.smoothing filter over the detected frequencies. Given the
+    detector's tuner, its latest_confidence weights each update.
+
+    Per-channel frequencies each get their own copy of the filter; an
+    unvoiced (NaN) channel stays NaN and leaves its copy untouched, as
+    gated frames do in the single-channel path.
+    """
+
+    name = "smoother"
+
+    def __init__(self, smoother, tuner=None):
+        super().__init__()
+        self.smoother = smoother
+        self.tuner = tuner
+        self._channels = []
+
+    def process(self, frequency):
+        confidence = self.tuner.latest_confidence if self.tuner else 1.0
+        if not isinstance(frequency, np.ndarray):
+            return self.smoother.update(frequency, confidence)
+
+        if len(self._channels) != len(frequency):
+            self._channels = [
+                copy.deepcopy(self.smoother) for _ in frequency
+            ]
+            for smoother in self._channels:
+                smoother.reset()
+
+        confidence = np.broadcast_to(confidence, frequency.shape)
+        smoothed = np.full(len(frequency), np.nan)
+        for i in np.flatnonzero(~np.isnan(frequency)):
+            smoothed[i] = self._channels[i].update(
+                frequency[i], confidence[i]
+            )
+        return smoothed
+
+    def reset(self):
+        self.smoother.reset()
+        self._channels = []
+
+
+class NoteMapper(Stage):
+    """
+    Frequency -> (note, frequency, cents), dropping unnamed pitches.
+    Per-channel frequencies give (names, frequencies, cents) arrays ("" and
+    NaN for unvoiced channels), dropped only when no channel is named.
+    """
+
+    name = "notes"
+
+    def __init__(self, a4=440.0):
+        super().__init__()
+        self.a4 = a4
+
+    def process(self, frequency):
+        if isinstance(frequency, np.ndarray):
+            names, ref_freqs, cents = frequencies_to_notes(frequency, self.a4)
+            if not (names != "").any():
+                return None
+            return names, frequency, cents
+
+        note, ref_freq, cents = frequency_to_note(frequency, a4=self.a4)
+        if not note:
+            return None
+        return note, frequency, cents
+
+
+# -------------------------
+
+
+def tuner_pipeline(sample_rate, buffer_size=2048, hop_size=512,
+                   decimate="auto", a4=440.0, smoother=None,
+                   **tuner_kwargs):
+    """
+    The live tuner chain: decimate -> framer -> dc -> gate -> detector ->
+    smoother -> notes. The decimate stage is left out when the tuner
+    does not decimate (by default below 2 * AUTO_ANALYSIS_RATE, see
+    TunerEngine). smoother is any core.smoothing filter (default:
+    running median of 5). Blocks may be 1-D or (channels, samples); the
+    latter give per-channel results (see NoteMapper).
+    """
+    tuner = TunerEngine(
+        sample_rate=sample_rate,
+        buffer_size=buffer_size,
+        hop_size=hop_size,
+        decimate=decimate,
+        **tuner_kwargs,
+    )
+    factor = tuner.decimation_factor
+    window = buffer_size // factor
+
+    stages = []
+    if factor > 1:
+        stages.append(Decimate(factor))
+
+    stages += [
+        Framer(window, tuner.stream_hop_size // factor),
+        RemoveDC(window, tuner.dtype),
+        NoiseGate(tuner=tuner),
+        Detector(tuner),
+        Smooth(smoother or RunningMedian(5), tuner),
+        NoteMapper(a4),
+    ]
+    return Pipeline(stages)
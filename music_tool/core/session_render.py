@@ -0,0 +1,91 @@
+import numpy as np
+
+from core.beat_clock import BeatClock
+from core.pattern_cache import SOUNDS, bar_events, metronome_sounds
+
+
+# Onsets scattered per step; bounds the index array to this many clicks
+SCATTER_CHUNK = 1024
+
+
+def session_frames(sample_rate, ramp_seconds, hold_seconds=0.0):
+    return round((ramp_seconds + hold_seconds) * sample_rate)
+
+
+def session_onsets(clock, frames, beats_per_bar=4, subdivision=1,
+                   polyrhythm=None):
+    """
+    Onset samples below frames of every event in the session, computed
+    in closed form from the clock: {sound: sorted int64 array}.
+    """
+    bars = np.arange(int(clock.beat_at(frames) // beats_per_bar) + 1)
+    events = bar_events(beats_per_bar, subdivision, polyrhythm)
+
+    onsets = {}
+    for sound in SOUNDS:
+        positions = [position for position, name in events if name == sound]
+        if not positions:
+            continue
+
+        beats = bars[:, None] * beats_per_bar + np.array(positions)
+        samples = clock.samples_of(beats.ravel())
+        onsets[sound] = samples[samples < frames]
+
+    return onsets
+
+
+def scatter_clicks(out, onsets, click):
+    """
+    out[onset + i] += click[i] for every onset, dropping whatever runs
+    past the end of out.
+    """
+    if not len(onsets):
+        return
+
+    offsets = np.arange(len(click))
+    # Clicks that can't overlap each other take the buffered fancy-index
+    # add, which is several times faster than np.add.at
+    overlapping = np.any(np.diff(onsets) < len(click))
+
+    for start in range(0, len(onsets), SCATTER_CHUNK):
+        index = onsets[start:start + SCATTER_CHUNK, None] + offsets
+        values = np.broadcast_to(click, index.shape)
+
+        if index[-1, -1] >= len(out):
+            inside = index < len(out)
+            index, values = index[inside], values[inside]
+
+        if overlapping:
+            np.add.at(out, index, values)
+        else:
+            out[index] += values
+
+
+def render_session(sample_rate, start_bpm, end_bpm, ramp_seconds,
+                   hold_seconds=0.0, beats_per_bar=4, subdivision=1,
+                   polyrhythm=None, out=None, sounds=None):
+    """
+    Render a practice session without an audio device: the tempo ramps
+    from start_bpm to end_bpm over ramp_seconds, as in MetronomeEngine's
+    practice mode, then holds for hold_seconds.
+
+    out is a zeroed float32 buffer of session_frames() samples, e.g. a
+    memmap from utils.wav_file.create_wav for sessions larger than RAM;
+    one is allocated if None. Returns out.
+    """
+    frames = session_frames(sample_rate, ramp_seconds, hold_seconds)
+    if out is None:
+        out = np.zeros(frames, dtype="float32")
+    elif len(out) != frames:
+        raise ValueError(f"out has {len(out)} samples, expected {frames}")
+
+    sounds = sounds or metronome_sounds(sample_rate)
+    clock = BeatClock(sample_rate, start_bpm, end_bpm, ramp_seconds)
+
+    onsets = session_onsets(
+        clock, frames, beats_per_bar, subdivision, polyrhythm
+    )
+    for sound, samples in onsets.items():
+        scatter_clicks(out, samples, np.asarray(sounds[sound]))
+
+    return out
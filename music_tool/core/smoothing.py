@@ -0,0 +1,176 @@
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from collections import deque
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class Smoother(ABC):
+    """
+    Base for the pitch smoothing filters.
+
+    update() takes one estimate (and optionally the detector's confidence
+    in it, 0..1) and returns the smoothed value; it is what the live
+    pipeline calls per frame. apply() runs the same filter over a whole
+    array from a fresh state. NaN entries are treated as unvoiced gaps:
+    they stay NaN in the output and are skipped by the filter, as gated
+    frames never reach update() in the live path.
+
+    latency is the filter's approximate delay, in frames. Subclasses
+    must implement update(); one that does not fails at construction.
+    """
+
+    latency = 0.0
+
+    @abstractmethod
+    def update(self, value, confidence=1.0):
+        ...
+
+    def reset(self):
+        pass
+
+    def apply(self, values, confidence=None):
+        values = np.asarray(values, dtype=float)
+        out = np.full(len(values), np.nan)
+
+        voiced = np.flatnonzero(~np.isnan(values))
+        if confidence is None:
+            weights = np.ones(len(voiced))
+        else:
+            weights = np.asarray(confidence, dtype=float)[voiced]
+
+        self.reset()
+        out[voiced] = self._apply_voiced(values[voiced], weights)
+        self.reset()
+        return out
+
+    def _apply_voiced(self, values, confidence):
+        return np.array([
+            self.update(v, c) for v, c in zip(values, confidence)
+        ])
+
+
+class RunningMedian(Smoother):
+    """
+    Median of the last size values.
+
+    A sorted copy of the window is kept next to the arrival order, so an
+    update is two bisections (O(log n) compares plus a short list shift)
+    instead of building and sorting a new array.
+    """
+
+    def __init__(self, size=5):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.size = size
+        self.reset()
+
+    @property
+    def latency(self):
+        return (self.size - 1) / 2
+
+    def reset(self):
+        self._window = deque()
+        self._sorted = []
+
+    def update(self, value, confidence=1.0):
+        if len(self._window) == self.size:
+            oldest = self._window.popleft()
+            del self._sorted[bisect_left(self._sorted, oldest)]
+
+        self._window.append(value)
+        insort(self._sorted, value)
+
+        n = len(self._sorted)
+        mid = n // 2
+        if n % 2:
+            return self._sorted[mid]
+        return 0.5 * (self._sorted[mid - 1] + self._sorted[mid])
+
+    def _apply_voiced(self, values, confidence):
+        # Windows that are already full in one vectorized pass; the first
+        # size - 1 partial windows through the live filter
+        head = min(len(values), self.size - 1)
+        out = np.empty(len(values))
+        out[:head] = super()._apply_voiced(values[:head], confidence[:head])
+
+        if len(values) >= self.size:
+            windows = sliding_window_view(values, self.size)
+            out[self.size - 1:] = np.median(windows, axis=1)
+
+        return out
+
+
+class OneEuroFilter(Smoother):
+    """
+    One Euro filter (Casiez et al.): a low-pass whose cutoff rises with
+    the speed of change, so held notes are steady while note changes are
+    followed with little lag.
+
+    rate is the update rate in Hz (frames per second). min_cutoff (Hz)
+    sets the smoothing when the pitch holds still; beta how quickly the
+    cutoff opens up as it moves. Values are filtered as given, so beta
+    depends on the unit (Hz here).
+    """
+
+    def __init__(self, rate, min_cutoff=1.0, beta=0.05, d_cutoff=1.0):
+        self.rate = rate
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    @property
+    def latency(self):
+        # Time constant of the resting low-pass, in frames
+        return self.rate / (2 * math.pi * self.min_cutoff)
+
+    def reset(self):
+        self._value = None
+        self._slope = 0.0
+
+    def _alpha(self, cutoff):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau * self.rate)
+
+    def update(self, value, confidence=1.0):
+        if self._value is None:
+            self._value = value
+            return value
+
+        slope = (value - self._value) * self.rate
+        self._slope += self._alpha(self.d_cutoff) * (slope - self._slope)
+
+        cutoff = self.min_cutoff + self.beta * abs(self._slope)
+        self._value += self._alpha(cutoff) * (value - self._value)
+        return self._value
+
+
+class ConfidenceEMA(Smoother):
+    """
+    Exponential moving average whose step is scaled by the detector's
+    confidence: a clean frame moves the estimate by alpha, a doubtful
+    one proportionally less.
+    """
+
+    def __init__(self, alpha=0.5):
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.reset()
+
+    @property
+    def latency(self):
+        return (1 - self.alpha) / self.alpha
+
+    def reset(self):
+        self._value = None
+
+    def update(self, value, confidence=1.0):
+        if self._value is None:
+            self._value = value
+        else:
+            weight = self.alpha * min(max(confidence, 0.0), 1.0)
+            self._value += weight * (value - self._value)
+        return self._value
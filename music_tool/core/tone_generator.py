@@ -23,6 +23,9 @@ class ToneGenerator:
         self.volume = 0.3
         self.running = False
 
+        # Extra frequencies sounding with the main note (chord / drone)
+        self.extra_frequencies = []
+
     # -------------------------
 
     def set_a4(self, value):
@@ -32,20 +35,44 @@ class ToneGenerator:
         self.volume = max(0.0, min(1.0, volume))
 
         if self.running:
-            self.audio_engine.enable_tone(
-                self.frequency,
-                self.volume
-            )
+            self._apply()
 
     def set_note(self, note_name, octave):
-        midi_number = (octave + 1) * 12 + NOTE_INDEX[note_name]
-        self.frequency = self.a4 * (2 ** ((midi_number - 69) / 12))
+        self.frequency = self._note_frequency(note_name, octave)
+
+        if self.running:
+            self._apply()
+
+    def set_chord(self, notes):
+        """
+        Sound extra (note_name, octave) pairs with the main note, e.g. a
+        fifth or an open-string drone. An empty list goes back to a
+        single tone. The volume is shared between the voices.
+        """
+        voices = self.audio_engine.oscillator.voices
+        self.extra_frequencies = [
+            self._note_frequency(name, octave)
+            for name, octave in notes[:voices - 1]
+        ]
 
         if self.running:
-            self.audio_engine.enable_tone(
-                self.frequency,
-                self.volume
-            )
+            self._apply()
+
+    def _note_frequency(self, note_name, octave):
+        midi_number = (octave + 1) * 12 + NOTE_INDEX[note_name]
+        return self.a4 * (2 ** ((midi_number - 69) / 12))
+
+    def _apply(self):
+        frequencies = [self.frequency] + self.extra_frequencies
+        volume = self.volume / len(frequencies)
+
+        for voice in range(self.audio_engine.oscillator.voices):
+            if voice < len(frequencies):
+                self.audio_engine.enable_tone(
+                    frequencies[voice], volume, voice
+                )
+            else:
+                self.audio_engine.disable_tone(voice)
 
     # -------------------------
 
@@ -55,10 +82,7 @@ class ToneGenerator:
 
         self.running = True
         self.audio_engine.start_output_stream()
-        self.audio_engine.enable_tone(
-            self.frequency,
-            self.volume
-        )
+        self._apply()
 
     def stop(self):
         self.running = False
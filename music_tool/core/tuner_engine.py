@@ -1,4 +1,40 @@
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from core import dsp_utils
+from core.analysis_plan import AnalysisPlan
+from core.decimator import Decimator
+from core.frame_ring import FrameRing
+
+
+SILENCE_RMS = 0.01
+
+# With decimate=True the analysis rate is the lowest integer division of
+# sample_rate that stays above ANALYSIS_OVERSAMPLING * fmax.
+ANALYSIS_OVERSAMPLING = 8
+
+# decimate="auto" divides the rate by the largest integer that keeps the
+# analysis rate at or above AUTO_ANALYSIS_RATE (factor 2 at 88.2/96 kHz,
+# none at 44.1/48 kHz). The 8 * fmax grid of decimate=True shifts steady
+# tones by ~20 cents and turns some into octave errors, so the live
+# tuner only sheds the oversampling a high-rate device adds.
+AUTO_ANALYSIS_RATE = 44100
+
+# Coarse-to-fine search: the coarse stage keeps every dip whose CMND falls
+# below COARSE_SLACK * threshold, and at most COARSE_CANDIDATES of them
+# are refined at full rate.
+COARSE_SLACK = 2.0
+COARSE_CANDIDATES = 3
+
+# Tracking mode: the narrow search spans TRACK_CENTS either side of the
+# last confident period, and every TRACK_REFRESH-th frame is searched in
+# full anyway so a jump to an earlier dip (e.g. an octave up) is not missed.
+TRACK_CENTS = 100
+TRACK_REFRESH = 16
+
+# Frames analysed per vectorized pass in process_batch; bounds the
+# temporary (frames x fft_size) arrays for long signals.
+BATCH_FRAMES = 256
 
 
 class TunerEngine:
@@ -9,67 +45,617 @@ class TunerEngine:
         fmin=70,
         fmax=1000,
         threshold=0.1,
+        hop_size=None,
+        dtype="float64",
+        decimate=False,
+        coarse_factor=None,
+        tracking=False,
     ):
         self.sample_rate = sample_rate
         self.buffer_size = buffer_size
         self.fmin = fmin
         self.fmax = fmax
         self.threshold = threshold
+        self.hop_size = hop_size
+        # "float32" runs the whole analysis in single precision; estimates
+        # stay within about half a cent of float64 on clean input.
+        self.dtype = dtype
+        # True, False, or "auto" (down to AUTO_ANALYSIS_RATE at most)
+        self.decimate = decimate
+        # Decimation of the coarse lag search stage; None searches every
+        # lag at full rate. Pays off on long frames only (see
+        # _yin_coarse_to_fine).
+        self.coarse_factor = coarse_factor
+        # Search near the previous period first (process/process_stream
+        # only; process_batch frames are independent)
+        self.tracking = tracking
 
         self.latest_frequency = None
+        # 1 - CMND at the chosen lag: near 1 for a clean periodic frame,
+        # approaching 1 - threshold for a marginal one
+        self.latest_confidence = None
+
+        # Tracking state and counters (see _track)
+        self.tracking_hits = 0
+        self.tracking_fallbacks = 0
+        self._track_lag = None
+        self._track_age = 0
+        # Integer lag and CMND value of the last threshold crossing found
+        # (per frame after a batch pass)
+        self._crossing = None
+        self._aperiodicity = None
+        self._batch_confidence = None
+
+        self._plan = None
+        self._decimator = None
+        self._coarse_plan = None
+
+        # Streaming state (see process_stream)
+        self._ring = None
 
     #  PUBLIC METHOD
 
+    @property
+    def decimation_factor(self):
+        if not self.decimate:
+            return 1
+        if self.decimate == "auto":
+            return max(1, int(self.sample_rate // AUTO_ANALYSIS_RATE))
+        return max(
+            1, int(self.sample_rate // (ANALYSIS_OVERSAMPLING * self.fmax))
+        )
+
+    @property
+    def analysis_rate(self):
+        return self.sample_rate / self.decimation_factor
+
+    @property
+    def stream_hop_size(self):
+        """
+        Input samples between analyses in process_stream (hop_size rounded
+        down to a whole number of decimated samples).
+        """
+        factor = self.decimation_factor
+        hop = self.hop_size or self.buffer_size
+        return max(1, hop // factor) * factor
+
     def process(self, audio_buffer):
         if len(audio_buffer) < self.buffer_size:
             return None
 
         audio_buffer = audio_buffer[: self.buffer_size]
 
-        audio_buffer = audio_buffer - np.mean(audio_buffer)
+        if self.decimation_factor > 1:
+            audio_buffer = self._get_decimator().decimate(audio_buffer)
 
+        return self._analyse(audio_buffer)
 
-        if np.sqrt(np.mean(audio_buffer**2)) < 0.01:
+    def _analyse(self, audio_buffer):
+        """
+        Gate and pitch-detect one frame already at the analysis rate.
+        """
+        plan = self._get_plan()
+
+        frame = plan.frame
+        np.copyto(frame, audio_buffer[: plan.buffer_size], casting="unsafe")
+
+        frame -= frame.mean()
+
+        np.multiply(frame, frame, out=plan.squared)
+        if np.sqrt(plan.squared.mean()) < SILENCE_RMS:
+            self.forget_track()
             return None
 
-        tau = self._yin(audio_buffer)
+        return self._detect(frame)
+
+    def detect(self, frame):
+        """
+        Pitch of one frame already at the analysis rate, without the DC
+        removal and silence gate of process() (core.pipeline runs those
+        as stages of their own). Returns the frequency or None.
+
+        A (channels, samples) frame is analysed per channel in one
+        vectorized pass instead, gated per channel at SILENCE_RMS as
+        process_stream does, and gives an array of frequencies (NaN where
+        unvoiced); latest_frequency and latest_confidence are then
+        per-channel arrays too.
+        """
+        if frame.ndim == 2:
+            frames = np.asarray(frame, dtype=self.dtype)
+            frequencies = self._process_frames(frames)[0]
+            self.latest_frequency = frequencies
+            self.latest_confidence = self._batch_confidence
+            return frequencies
+
+        plan = self._get_plan()
+        np.copyto(plan.frame, frame[: plan.buffer_size], casting="unsafe")
+        return self._detect(plan.frame)
+
+    def _detect(self, frame):
+        plan = self._get_plan()
+        tau = self._track(frame) if self.tracking else None
 
         if tau is None:
+            tau = self._search(frame)
+
+        if tau is None:
+            self._track_lag = None
             return None
 
-        frequency = self.sample_rate / tau
+        if self.tracking:
+            self._track_lag = self._crossing
+
+        frequency = plan.sample_rate / tau
         self.latest_frequency = frequency
+        self.latest_confidence = 1.0 - self._aperiodicity
         return frequency
 
+    def _search(self, frame):
+        if self.coarse_factor and self.coarse_factor > 1:
+            return self._yin_coarse_to_fine(frame)
+        return self._yin(frame)
+
+    def _track(self, x):
+        """
+        Tracking-mode search: the first threshold crossing within
+        TRACK_CENTS of the previous frame's crossing lag. The crossing
+        rather than the interpolated period is tracked, since it is what
+        the search has to bracket. Returns None, and counts
+        a fallback, when a full search is needed instead: no previous
+        period (start or after silence), the refresh is due, no lag in the
+        window is below threshold (low confidence or a large jump), the
+        window starts below threshold (the crossing moved earlier), or
+        CMND also dips below threshold around half the crossing lag (the
+        track is on twice the period).
+        """
+        plan = self._get_plan()
+        ratio = 2 ** (TRACK_CENTS / 1200)
+        last = min(plan.max_tau, plan.buffer_size) - 1
+
+        self._track_age += 1
+        if self._track_lag is None or self._track_age >= TRACK_REFRESH:
+            return self._track_fallback()
+
+        lo = max(plan.min_tau, int(self._track_lag / ratio))
+        hi = min(last, int(np.ceil(self._track_lag * ratio)))
+        if lo > hi:
+            return self._track_fallback()
+
+        start = max(1, lo - 1)
+        prefix = self._prefix_sums(x)
+        cmnd = self._cmnd_window(x, prefix, start, min(last, hi + 1))
+        hits = cmnd[lo - start:hi - start + 1] < self.threshold
+
+        if not hits.any() or (hits[0] and lo > plan.min_tau):
+            return self._track_fallback()
+
+        tau = lo - start + int(np.argmax(hits))
+
+        # A full search that missed the fundamental's dip in one noisy
+        # frame locks on twice the period, and the window alone would
+        # hold that until the refresh. Drop it once the dip is back.
+        half = (start + tau) / 2
+        lo = max(plan.min_tau, int(half / ratio))
+        hi = int(np.ceil(half * ratio))
+        if lo <= hi and (
+            self._cmnd_window(x, prefix, lo, hi) < self.threshold
+        ).any():
+            return self._track_fallback()
+
+        self.tracking_hits += 1
+        self._crossing = start + tau
+        self._aperiodicity = cmnd[tau]
+        return start + self._parabolic_interpolation(cmnd, tau)
+
+    def _track_fallback(self):
+        self._track_age = 0
+        self.tracking_fallbacks += 1
+        return None
+
+    def forget_track(self):
+        """
+        Drop the tracked period, e.g. on a silent frame, so the next frame
+        is searched in full. The counters are kept.
+        """
+        self._track_lag = None
+
+    def reset_tracking(self):
+        self._track_lag = None
+        self._track_age = 0
+        self.tracking_hits = 0
+        self.tracking_fallbacks = 0
+
+    def process_stream(self, block):
+        """
+        Streaming analysis decoupled from the device blocksize.
+
+        Incoming samples go into a FrameRing; once buffer_size samples
+        have arrived, the latest buffer_size samples are analysed every
+        hop_size new samples. Blocks of any length may be pushed. With
+        decimate=True the ring holds the decimated signal, whose filter
+        state carries across blocks.
+
+        A 2-D (channels, samples) block is tracked per channel: the ring
+        keeps one row per channel and each hop analyses all channels in a
+        single vectorized pass (as process_batch does).
+
+        Returns a list with one entry per completed hop: the frequency or
+        None for a 1-D block, an array of per-channel frequencies (NaN
+        where unvoiced) for a 2-D block.
+        """
+        if not 0 < (self.hop_size or self.buffer_size) <= self.buffer_size:
+            raise ValueError("hop_size must be between 1 and buffer_size")
+
+        factor = self.decimation_factor
+        window = self._get_plan().buffer_size
+        hop = self.stream_hop_size // factor
+
+        block = np.asarray(block)
+        channels = block.shape[0] if block.ndim == 2 else None
+
+        ring = self._ring
+        if ring is None or (ring.window, ring.hop, ring.channels) != (
+            window, hop, channels
+        ):
+            self.reset_stream(channels)
+
+        if factor > 1:
+            block = self._get_decimator().process(block)
+
+        results = []
+        for frame in self._ring.frames(block):
+            if channels is None:
+                results.append(self._analyse(frame))
+            else:
+                frames = np.asarray(frame, dtype=self.dtype)
+                results.append(self._process_frames(frames)[0])
+
+        return results
+
+    def reset_stream(self, channels=None):
+        self._ring = FrameRing(
+            self._get_plan().buffer_size,
+            self.stream_hop_size // self.decimation_factor,
+            channels,
+        )
+        self.reset_tracking()
+
+        if self._decimator is not None:
+            self._decimator.reset()
+
+    def process_batch(self, frames, hop_size=None):
+        """
+        Vectorized analysis of many frames.
+
+        frames is either a 2-D (n_frames, n_samples) array, or a 1-D signal
+        together with hop_size, in which case it is viewed as overlapping
+        buffer_size windows starting every hop_size samples.
+
+        Returns:
+            frequencies (ndarray, NaN where unvoiced)
+            voiced (bool ndarray)
+        """
+        frames = np.asarray(frames, dtype=self.dtype)
+
+        if hop_size is not None:
+            if len(frames) < self.buffer_size:
+                frames = np.zeros((0, self.buffer_size))
+            else:
+                frames = sliding_window_view(
+                    frames, self.buffer_size
+                )[::hop_size]
+        elif frames.ndim != 2:
+            raise ValueError("frames must be 2-D unless hop_size is given")
+
+        n_frames = len(frames)
+        frequencies = np.full(n_frames, np.nan)
+        voiced = np.zeros(n_frames, dtype=bool)
+
+        if frames.shape[1] < self.buffer_size:
+            return frequencies, voiced
+
+        for start in range(0, n_frames, BATCH_FRAMES):
+            chunk = frames[start:start + BATCH_FRAMES, : self.buffer_size]
+            if self.decimation_factor > 1:
+                chunk = self._get_decimator().decimate(chunk)
+            freq, ok = self._process_frames(chunk)
+            frequencies[start:start + len(chunk)] = freq
+            voiced[start:start + len(chunk)] = ok
+
+        return frequencies, voiced
+
+    def _process_frames(self, frames):
+        plan = self._get_plan()
+
+        frames = frames[:, : plan.buffer_size]
+        frames = frames - frames.mean(axis=1, keepdims=True)
+        rms = dsp_utils.rms(frames)
+
+        frequencies = np.full(len(frames), np.nan)
+        confidence = np.zeros(len(frames))
+        gated = np.flatnonzero(rms >= SILENCE_RMS)
+
+        if len(gated):
+            tau = self._yin_batch(frames[gated])
+            frequencies[gated] = plan.sample_rate / tau
+            confidence[gated] = 1.0 - self._aperiodicity
+        self._batch_confidence = confidence
+
+        return frequencies, ~np.isnan(frequencies)
+
+    def _get_plan(self):
+        # With decimation the plan describes the reduced-rate frame
+        factor = self.decimation_factor
+        key = (
+            self.sample_rate / factor,
+            self.buffer_size // factor,
+            self.fmin,
+            self.fmax,
+            self.threshold,
+            self.dtype,
+        )
+        if self._plan is None or self._plan.key != key:
+            self._plan = AnalysisPlan(*key)
+        return self._plan
+
+    def _get_coarse_plan(self):
+        plan = self._get_plan()
+        K = self.coarse_factor
+        key = (
+            plan.sample_rate / K,
+            plan.buffer_size // K,
+            self.fmin,
+            self.fmax,
+            self.threshold * COARSE_SLACK,
+            "float64",
+        )
+        if self._coarse_plan is None or self._coarse_plan.key != key:
+            self._coarse_plan = AnalysisPlan(*key)
+        return self._coarse_plan
+
+    def _get_decimator(self):
+        factor = self.decimation_factor
+        if self._decimator is None or self._decimator.factor != factor:
+            self._decimator = Decimator(factor)
+        return self._decimator
+
     #  YIN CORE
 
     def _yin(self, x):
-        N = len(x)
-        max_tau = int(self.sample_rate / self.fmin)
-        min_tau = int(self.sample_rate / self.fmax)
+        """
+        Single-frame YIN working entirely in the plan's scratch buffers.
+        """
+        plan = self._get_plan()
+        max_tau = plan.max_tau
+        cmnd = self._yin_cmnd(x, plan)
 
-        # 1️ Difference function
-        d = np.zeros(max_tau)
-        for tau in range(1, max_tau):
-            d[tau] = np.sum((x[:-tau] - x[tau:]) ** 2)
+        # 3️⃣ Absolute threshold
+        below = np.less(
+            cmnd[plan.min_tau:max_tau], self.threshold, out=plan.below
+        )
+        tau = int(np.argmax(below)) if len(below) else 0
+        if not len(below) or not below[tau]:
+            return None
 
-        # 2️ Cumulative mean normalized difference
-        cmnd = np.zeros_like(d)
-        cmnd[0] = 1
-        running_sum = 0.0
+        # 4️⃣ Parabolic interpolation
+        self._crossing = plan.min_tau + tau
+        self._aperiodicity = cmnd[plan.min_tau + tau]
+        return self._parabolic_interpolation(cmnd, plan.min_tau + tau)
 
-        for tau in range(1, max_tau):
-            running_sum += d[tau]
-            cmnd[tau] = d[tau] * tau / running_sum if running_sum != 0 else 1
+    def _yin_cmnd(self, x, plan):
+        """
+        CMND of frame x for every lag of plan, into plan.cmnd.
+        """
+        N = plan.buffer_size
+        max_tau = plan.max_tau
 
-        # 3️⃣ Absolute threshold
-        for tau in range(min_tau, max_tau):
-            if cmnd[tau] < self.threshold:
-                # 4️⃣ Parabolic interpolation
-                return self._parabolic_interpolation(cmnd, tau)
+        # 1️ Difference function (see _difference_function)
+        plan.padded[:N] = x
+        spectrum = plan.rfft(plan.padded)
+        np.conjugate(spectrum, out=plan.conj)
+        np.multiply(spectrum, plan.conj, out=spectrum)
+        acf = plan.irfft(spectrum)[:max_tau]
+
+        energy = plan.energy
+        np.multiply(x, x, out=plan.squared)
+        np.cumsum(plan.squared, out=energy[1:])
+
+        d = plan.d
+        np.take(energy, plan.head_index, out=d)
+        np.take(energy, plan.tail_index, out=plan.scratch)
+        np.subtract(energy[N], plan.scratch, out=plan.scratch)
+        d += plan.scratch
+        np.multiply(acf, 2, out=plan.scratch)
+        d -= plan.scratch
+        d[0] = 0.0
+        np.maximum(d, 0.0, out=d)
+
+        # 2️ Cumulative mean normalized difference (see _cmnd)
+        cmnd = plan.cmnd
+        np.cumsum(d, out=plan.running_sum)
+        np.not_equal(plan.running_sum, 0, out=plan.nonzero)
+        np.multiply(d, plan.lags, out=plan.scratch)
+        cmnd.fill(1.0)
+        np.divide(
+            plan.scratch, plan.running_sum, out=cmnd, where=plan.nonzero
+        )
+        return cmnd
+
+    def _yin_coarse_to_fine(self, x):
+        """
+        Two-stage YIN. The CMND of a coarse_factor-decimated copy of the
+        frame gives candidate dips; exact full-rate CMND is then computed
+        only for a few lags around each, in increasing lag order, and the
+        first threshold crossing is interpolated as in _yin.
+
+        The coarse FFT is coarse_factor times shorter, but the refinement
+        costs a fixed few dozen small NumPy calls plus an O(N) correlation
+        per lag, so the search only wins on long frames (low strings:
+        8192 samples and up with fmin=30, coarse_factor=8); at 2048
+        samples _yin is faster.
+        """
+        plan = self._get_plan()
+        coarse = self._get_coarse_plan()
+        K = self.coarse_factor
+
+        # Block sums are a crude low-pass, but the coarse stage only has
+        # to place the dips (CMND ignores the scale); every reported lag
+        # is evaluated at full rate.
+        M = coarse.buffer_size * K
+        xc = coarse.frame
+        np.copyto(xc, x[0:M:K])
+        for k in range(1, K):
+            xc += x[k:M:K]
+        cmnd_c = self._yin_cmnd(xc, coarse)
+
+        # Each run of coarse lags below the relaxed threshold is one dip
+        below = cmnd_c[coarse.min_tau:coarse.max_tau] < (
+            self.threshold * COARSE_SLACK
+        )
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], below, [0]))))
+        runs = edges.reshape(-1, 2) + coarse.min_tau
+
+        prefix = self._prefix_sums(x)
+        last = min(plan.max_tau, plan.buffer_size) - 1
+
+        for run_start, run_end in runs[:COARSE_CANDIDATES]:
+            dip = cmnd_c[run_start:run_end]
+            crossing = dip < self.threshold
+            c = run_start + int(
+                np.argmax(crossing) if crossing.any() else np.argmin(dip)
+            )
+
+            # One coarse lag either side; the loop below widens the
+            # window in the rare case the crossing is not inside
+            lo = max(plan.min_tau, (c - 1) * K)
+            hi = min(last, (c + 1) * K)
+            hi_limit = min(last, (run_end + 1) * K)
+
+            while True:
+                start = max(1, lo - 1)
+                cmnd = self._cmnd_window(
+                    x, prefix, start, min(last, hi + 1)
+                )
+                hits = cmnd[lo - start:hi - start + 1] < self.threshold
+
+                # Widen until the first crossing is strictly inside
+                if hits[0] and lo > plan.min_tau:
+                    lo = max(plan.min_tau, lo - 2 * K)
+                elif not hits.any() and hi < hi_limit:
+                    hi = min(hi_limit, hi + 2 * K)
+                else:
+                    break
+
+            if hits.any():
+                tau = lo - start + int(np.argmax(hits))
+                self._crossing = start + tau
+                self._aperiodicity = cmnd[tau]
+                return start + self._parabolic_interpolation(cmnd, tau)
 
         return None
 
+    def _prefix_sums(self, x):
+        """
+        What _cmnd_window needs from the whole frame, in the plan's
+        buffers: the prefix sums S of x, x ** 2, its energy and
+        dot(x, S[1:]). Also leaves x zero-padded in plan.padded for the
+        window's correlation. S is the only running sum over the frame;
+        every energy term of the window is local to its ends.
+        """
+        plan = self._get_plan()
+        N = len(x)
+        S, squared = plan.sums, plan.squared
+
+        plan.padded[:N] = x
+        np.cumsum(x, out=S[1:])
+        np.multiply(x, x, out=squared)
+        return S, squared, np.dot(x, x), np.dot(x, S[1:])
+
+    def _cmnd_window(self, x, prefix, lo, hi):
+        """
+        Exact CMND for lags lo..hi (inclusive, lo >= 1) without evaluating
+        the lags below lo. The cumulative sum of d(1..tau) that CMND needs
+        is rebuilt from the frame sums of _prefix_sums, the first and last
+        hi samples' energies, and the running sum of the autocorrelation
+        up to lo - 1.
+        """
+        N = len(x)
+        S, sq, energy, xS = prefix
+        plan = self._get_plan()
+        lags = plan.lags[lo:hi + 1]
+        m = lo - 1
+
+        # Direct correlation over just these lags; np.correlate does not
+        # copy the windows the way a dot on a strided view does.
+        # plan.padded holds x followed by zeros (see _prefix_sums).
+        r = np.correlate(plan.padded[lo:hi + N], x, mode="valid")
+
+        # With E(tau) = sum(sq[:tau]) and T(tau) = sum(sq[N - tau:]),
+        # d(tau) = 2 * energy - (E + T)(tau) - 2 * r(tau). E + T over the
+        # window is its value at m plus a running sum of both ends.
+        ends = np.cumsum(sq[m:hi] + sq[N - hi:N - m][::-1])
+        ends += np.dot(x[:m], x[:m]) + np.dot(x[N - m:], x[N - m:])
+
+        d = 2 * energy - ends
+        d -= r
+        d -= r
+        np.maximum(d, 0.0, out=d)
+
+        # sum(r(1..lo-1)) = sum_i x[i] * (S[min(i + lo, N)] - S[i + 1])
+        r_before = (
+            np.dot(x[:N - lo + 1], S[lo:])
+            + S[N] * (S[N] - S[N - lo + 1])
+            - xS
+        )
+
+        # sum(d(1..tau)) = 2 * tau * energy - sum((E + T)(1..tau))
+        #                  - 2 * sum(r(1..tau)); the sum of E + T up to m
+        # weighs each end sample by how many of those lags include it
+        running_sum = np.cumsum(ends)
+        running_sum += (
+            np.dot(sq[:m], plan.lags[m:0:-1])
+            + np.dot(sq[N - m:], plan.lags[1:m + 1])
+        )
+        r_running = np.cumsum(r)
+        r_running += r_before
+        running_sum += r_running
+        running_sum += r_running
+        np.subtract(lags * (2 * energy), running_sum, out=running_sum)
+
+        cmnd = np.ones(len(lags))
+        d *= lags
+        np.divide(d, running_sum, out=cmnd, where=running_sum > 0)
+        return cmnd
+
+    def _yin_batch(self, frames):
+        plan = self._get_plan()
+
+        cmnd = self._cmnd(self._difference_function(frames, plan))
+
+        below = cmnd[:, plan.min_tau:plan.max_tau] < self.threshold
+        found = below.any(axis=1)
+        tau = plan.min_tau + np.argmax(below, axis=1)
+        self._aperiodicity = np.where(
+            found, cmnd[np.arange(len(tau)), tau], 1.0
+        )
+
+        tau = self._parabolic_interpolation_batch(cmnd, tau)
+        tau[~found] = np.nan
+        return tau
+
+    #  Difference function / CMND
+
+    def _difference_function(self, x, plan):
+        """
+        d(tau) for tau < max_tau along the last axis, so x may be one frame
+        or a stack of them (see dsp_utils.difference; the single-frame
+        path in _yin computes the same thing in the plan's buffers).
+        """
+        return dsp_utils.difference(x, plan.max_tau)
+
+    def _cmnd(self, d):
+        return dsp_utils.cmnd(d)
+
     #  Interpolation
 
     def _parabolic_interpolation(self, cmnd, tau):
@@ -85,4 +671,19 @@ class TunerEngine:
             return tau
 
         delta = (s2 - s0) / denom
-        return tau + delta
\ No newline at end of file
+        return tau + delta
+
+    def _parabolic_interpolation_batch(self, cmnd, tau):
+        rows = np.arange(len(tau))
+        inner = (tau > 0) & (tau < cmnd.shape[1] - 1)
+
+        s0 = cmnd[rows, np.clip(tau - 1, 0, None)]
+        s1 = cmnd[rows, tau]
+        s2 = cmnd[rows, np.clip(tau + 1, None, cmnd.shape[1] - 1)]
+
+        denom = 2 * (2 * s1 - s2 - s0)
+        inner &= denom != 0
+
+        delta = np.zeros(len(tau), dtype=cmnd.dtype)
+        np.divide(s2 - s0, denom, out=delta, where=inner)
+        return tau + delta
@@ -0,0 +1,274 @@
+import argparse
+import json
+import time
+import numpy as np
+
+from core.smoothing import RunningMedian, OneEuroFilter, ConfidenceEMA
+from core.tuner_engine import TunerEngine
+from utils.synth import (
+    tone,
+    plucked_string,
+    vibrato_tone,
+    octave_ambiguous,
+    add_noise,
+)
+
+
+SAMPLE_RATE = 44100
+BLOCK_SIZE = 512
+
+# Frames whose estimate is off by more than this are counted as octave
+# (gross) errors and left out of the cents-error statistics.
+OCTAVE_ERROR_CENTS = 600
+
+# Named TunerEngine configurations to score. "hop" is the streaming hop,
+# "smoother" names an entry of SMOOTHERS applied to the estimates of each
+# item; everything else is passed to TunerEngine.
+CONFIGS = {
+    "default": {"buffer_size": 2048, "hop": 512},
+    "buffer-1024": {"buffer_size": 1024, "hop": 512},
+    "buffer-4096": {"buffer_size": 4096, "hop": 512},
+    "threshold-0.15": {"buffer_size": 2048, "hop": 512, "threshold": 0.15},
+    "float32": {"buffer_size": 2048, "hop": 512, "dtype": "float32"},
+    "decimated": {"buffer_size": 2048, "hop": 512, "decimate": True},
+    "decimate-auto": {"buffer_size": 2048, "hop": 512, "decimate": "auto"},
+    "low-8192": {"buffer_size": 8192, "hop": 512, "fmin": 30},
+    "coarse-8": {
+        "buffer_size": 8192, "hop": 512, "fmin": 30, "coarse_factor": 8,
+    },
+    "tracking": {"buffer_size": 2048, "hop": 512, "tracking": True},
+    "median-5": {"buffer_size": 2048, "hop": 512, "smoother": "median-5"},
+    "one-euro": {"buffer_size": 2048, "hop": 512, "smoother": "one-euro"},
+    "ema": {"buffer_size": 2048, "hop": 512, "smoother": "ema"},
+}
+
+# Smoothers by name, built from the frame rate (analyses per second)
+SMOOTHERS = {
+    "median-5": lambda rate: RunningMedian(5),
+    "one-euro": lambda rate: OneEuroFilter(rate),
+    "ema": lambda rate: ConfidenceEMA(0.5),
+}
+
+
+class CorpusItem:
+    def __init__(self, name, category, signal, f0):
+        self.name = name
+        self.category = category
+        self.signal = signal
+        # Ground-truth fundamental per sample
+        self.f0 = f0
+
+
+def build_corpus(fmin=70, fmax=1000, seconds=1.0, n_pitches=8,
+                 sample_rate=SAMPLE_RATE):
+    n = int(seconds * sample_rate)
+    pitches = np.geomspace(fmin * 1.1, fmax * 0.9, n_pitches)
+    items = []
+
+    for i, f in enumerate(pitches):
+        const = np.full(n, f)
+
+        items.append(CorpusItem(
+            f"pure-{f:.0f}", "pure", tone(f, n, sample_rate), const
+        ))
+
+        B = 1e-4
+        items.append(CorpusItem(
+            f"plucked-{f:.0f}", "plucked",
+            plucked_string(f, n, sample_rate, inharmonicity=B, seed=i),
+            np.full(n, f * np.sqrt(1 + B)),
+        ))
+
+        signal, f0 = vibrato_tone(f, n, sample_rate)
+        items.append(CorpusItem(f"vibrato-{f:.0f}", "vibrato", signal, f0))
+
+        items.append(CorpusItem(
+            f"octave-{f:.0f}", "octave",
+            octave_ambiguous(f, n, sample_rate), const,
+        ))
+
+        for snr in (20, 10, 0):
+            harmonic = tone(f, n, sample_rate, harmonics=(1.0, 0.5, 0.3))
+            items.append(CorpusItem(
+                f"noise{snr}dB-{f:.0f}", f"snr-{snr}dB",
+                add_noise(harmonic, snr, seed=i), const,
+            ))
+
+    return items
+
+
+# -------------------------
+
+
+def make_tuner(config, sample_rate=SAMPLE_RATE):
+    kwargs = {
+        k: v for k, v in config.items() if k not in ("hop", "smoother")
+    }
+    return TunerEngine(
+        sample_rate=sample_rate, hop_size=config["hop"], **kwargs
+    )
+
+
+def track_item(tuner, item):
+    """
+    Stream the item through the tuner in device-sized blocks, as the live
+    path does. Returns (estimates, truth, cpu_seconds) per analysed frame.
+    """
+    tuner.reset_stream()
+    estimates = []
+
+    cpu = time.process_time()
+    for start in range(0, len(item.signal), BLOCK_SIZE):
+        estimates.extend(
+            tuner.process_stream(item.signal[start:start + BLOCK_SIZE])
+        )
+    cpu = time.process_time() - cpu
+
+    estimates = np.array(
+        [np.nan if e is None else e for e in estimates], dtype=float
+    )
+
+    # Frame k covers [k * hop, k * hop + buffer_size); compare at its centre
+    hop = tuner.stream_hop_size
+    centres = np.arange(len(estimates)) * hop + tuner.buffer_size // 2
+    truth = item.f0[centres]
+
+    return estimates, truth, cpu
+
+
+def score(estimates, truth):
+    voiced = ~np.isnan(estimates)
+
+    # Non-positive estimates (runaway interpolation) count as gross errors
+    ratio = estimates[voiced] / truth[voiced]
+    positive = ratio > 0
+    errors = np.full(len(ratio), np.inf)
+    errors[positive] = 1200 * np.log2(ratio[positive])
+
+    gross = np.abs(errors) > OCTAVE_ERROR_CENTS
+    fine = np.abs(errors[~gross])
+
+    return {
+        "frames": int(len(truth)),
+        "voicing_recall": float(voiced.mean()) if len(truth) else 0.0,
+        "octave_error_rate": float(gross.mean()) if len(gross) else 0.0,
+        "median_cents_error": float(np.median(fine)) if len(fine) else None,
+        "p95_cents_error": (
+            float(np.percentile(fine, 95)) if len(fine) else None
+        ),
+    }
+
+
+def evaluate(config, corpus, sample_rate=SAMPLE_RATE):
+    tuner = make_tuner(config, sample_rate)
+
+    by_category = {}
+    cpu_total = 0.0
+    frames_total = 0
+
+    smoother = None
+    if "smoother" in config:
+        rate = sample_rate / tuner.stream_hop_size
+        smoother = SMOOTHERS[config["smoother"]](rate)
+
+    for item in corpus:
+        estimates, truth, cpu = track_item(tuner, item)
+        if smoother:
+            estimates = smoother.apply(estimates)
+        cpu_total += cpu
+        frames_total += len(truth)
+
+        acc = by_category.setdefault(item.category, ([], []))
+        acc[0].append(estimates)
+        acc[1].append(truth)
+
+    categories = {
+        name: score(np.concatenate(est), np.concatenate(tru))
+        for name, (est, tru) in by_category.items()
+    }
+    overall = score(
+        np.concatenate([np.concatenate(e) for e, _ in by_category.values()]),
+        np.concatenate([np.concatenate(t) for _, t in by_category.values()]),
+    )
+    overall["cpu_us_per_frame"] = cpu_total * 1e6 / max(1, frames_total)
+
+    return {"overall": overall, "categories": categories}
+
+
+# -------------------------
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Score pitch detector configurations on a synthetic "
+                    "corpus (accuracy vs CPU cost)."
+    )
+    parser.add_argument(
+        "-c", "--config", action="append", choices=sorted(CONFIGS),
+        help="configuration to score (repeatable; default: all)",
+    )
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument(
+        "--seconds", type=float, default=1.0,
+        help="length of each corpus item",
+    )
+    parser.add_argument(
+        "--sample-rate", type=int, default=SAMPLE_RATE,
+        help="corpus and device rate in Hz (buffer and hop sizes are in "
+             "samples at this rate)",
+    )
+    parser.add_argument(
+        "--categories", action="store_true",
+        help="also print per-category scores",
+    )
+    return parser.parse_args(argv)
+
+
+def format_cents(value):
+    return "   --" if value is None else f"{value:5.2f}"
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    corpus = build_corpus(seconds=args.seconds, sample_rate=args.sample_rate)
+
+    results = {}
+    print(
+        f"{'config':18s} {'cents p50':>9s} {'cents p95':>9s} "
+        f"{'octave%':>8s} {'recall%':>8s} {'cpu us/frame':>13s}"
+    )
+
+    for name in args.config or CONFIGS:
+        result = evaluate(CONFIGS[name], corpus, args.sample_rate)
+        results[name] = result
+
+        o = result["overall"]
+        print(
+            f"{name:18s} {format_cents(o['median_cents_error']):>9s} "
+            f"{format_cents(o['p95_cents_error']):>9s} "
+            f"{100 * o['octave_error_rate']:8.2f} "
+            f"{100 * o['voicing_recall']:8.2f} "
+            f"{o['cpu_us_per_frame']:13.1f}"
+        )
+
+        if args.categories:
+            for category, c in result["categories"].items():
+                print(
+                    f"  {category:16s} "
+                    f"{format_cents(c['median_cents_error']):>9s} "
+                    f"{format_cents(c['p95_cents_error']):>9s} "
+                    f"{100 * c['octave_error_rate']:8.2f} "
+                    f"{100 * c['voicing_recall']:8.2f}"
+                )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "sample_rate": args.sample_rate,
+                "configs": CONFIGS,
+                "results": results,
+            }, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
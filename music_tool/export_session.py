@@ -0,0 +1,95 @@
+import argparse
+import sys
+import time
+import numpy as np
+
+from core.session_render import render_session, session_frames
+from utils.wav_file import create_wav
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render a metronome practice session (tempo ramp) "
+                    "to a WAV or .npy file without an audio device."
+    )
+    parser.add_argument("output", help="output file (.wav or .npy)")
+    parser.add_argument("--start-bpm", type=float, default=60)
+    parser.add_argument("--end-bpm", type=float, default=120)
+    parser.add_argument(
+        "--minutes", type=float, default=10,
+        help="length of the ramp from --start-bpm to --end-bpm",
+    )
+    parser.add_argument(
+        "--hold-minutes", type=float, default=0,
+        help="time to keep playing at --end-bpm after the ramp",
+    )
+    parser.add_argument(
+        "--signature", default="4/4",
+        help="time signature, e.g. 3/4 or 7/8",
+    )
+    parser.add_argument(
+        "--subdivision", type=int, default=1,
+        help="clicks per beat",
+    )
+    parser.add_argument(
+        "--polyrhythm", type=int, default=None,
+        help="extra pulse of this many even hits per bar",
+    )
+    parser.add_argument("--sample-rate", type=int, default=44100)
+    return parser.parse_args(argv)
+
+
+def open_output(path, frames, sample_rate):
+    """
+    Zeroed, memory-mapped float32 buffer backed by the output file.
+    """
+    if path.endswith(".npy"):
+        return np.lib.format.open_memmap(
+            path, mode="w+", dtype="float32", shape=(frames,)
+        )
+    return create_wav(path, frames, sample_rate)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    try:
+        beats, _ = (int(v) for v in args.signature.split("/"))
+    except ValueError:
+        print(f"Error: bad time signature {args.signature!r}", file=sys.stderr)
+        sys.exit(2)
+
+    ramp_seconds = args.minutes * 60
+    hold_seconds = args.hold_minutes * 60
+    frames = session_frames(args.sample_rate, ramp_seconds, hold_seconds)
+
+    start = time.perf_counter()
+    try:
+        out = open_output(args.output, frames, args.sample_rate)
+        render_session(
+            args.sample_rate,
+            args.start_bpm,
+            args.end_bpm,
+            ramp_seconds,
+            hold_seconds,
+            beats_per_bar=max(1, beats),
+            subdivision=max(1, args.subdivision),
+            polyrhythm=args.polyrhythm,
+            out=out,
+        )
+        out.flush()
+        del out
+    except (OSError, ValueError) as e:
+        print("Error:", e, file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    seconds = frames / args.sample_rate
+    print(
+        f"{args.output}: {seconds / 60:.1f} min rendered in {elapsed:.2f} s "
+        f"({seconds / max(elapsed, 1e-9):.0f}x realtime)"
+    )
+
+
+if __name__ == "__main__":
+    main()
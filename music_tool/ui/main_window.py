@@ -6,7 +6,15 @@ from PySide6.QtWidgets import (
     QMessageBox,
     QMenuBar,
 )
+from PySide6.QtCore import Signal
+import threading
+
 from core.audio_engine import AudioEngine
+from core.latency_calibration import (
+    LatencyCalibrator,
+    load_latency,
+    save_latency,
+)
 from ui.tuner_widget import TunerWidget
 from ui.metronome_widget import MetronomeWidget
 from utils.settings_manager import SettingsManager
@@ -14,14 +22,29 @@ from version import APP_NAME, APP_VERSION, APP_AUTHOR
 
 
 class MainWindow(QMainWindow):
+
+    # Posted from the calibration thread: the result dict, or
+    # {"error": message} if calibration raised
+    latency_calibrated = Signal(object)
+
     def __init__(self):
         super().__init__()
 
         self.settings = SettingsManager()
-        self.audio_engine = AudioEngine()
+        self.audio_engine = AudioEngine(
+            blocksize=512,
+            channels=self.settings.get("input_channels", 1),
+            duplex=self.settings.get("duplex", False),
+        )
+
+        # Optional periodic dump of audio callback health metrics
+        metrics_file = self.settings.get("metrics_file")
+        if metrics_file:
+            self.audio_engine.metrics.start_dump(metrics_file)
 
         self._setup_ui()
         self._setup_menu()
+        self.latency_calibrated.connect(self._show_latency)
         self._load_settings()
 
     # -------------------------
@@ -49,6 +72,11 @@ class MainWindow(QMainWindow):
         menu_bar = QMenuBar(self)
         self.setMenuBar(menu_bar)
 
+        tools_menu = menu_bar.addMenu("Tools")
+
+        self.latency_action = tools_menu.addAction("Calibrate Latency...")
+        self.latency_action.triggered.connect(self._calibrate_latency)
+
         help_menu = menu_bar.addMenu("Help")
 
         about_action = help_menu.addAction("About")
@@ -71,12 +99,90 @@ with Progressive Practice Mode
 
     # -------------------------
 
+    def _calibrate_latency(self):
+        if not self.audio_engine.duplex:
+            QMessageBox.information(
+                self,
+                "Calibrate Latency",
+                'Latency calibration needs duplex audio: set "duplex": true '
+                "in settings.json and restart.",
+            )
+            return
+
+        if self.metronome_tab.metronome.running:
+            self.metronome_tab.toggle_metronome()
+
+        answer = QMessageBox.question(
+            self,
+            "Calibrate Latency",
+            "Connect the output to the input (loopback cable, or the "
+            "speaker next to the microphone), then press OK.",
+            QMessageBox.Ok | QMessageBox.Cancel,
+        )
+        if answer != QMessageBox.Ok:
+            return
+
+        # The run takes a few seconds; keep the window responsive
+        self.latency_action.setEnabled(False)
+        self.statusBar().showMessage("Calibrating latency...")
+        threading.Thread(target=self._run_calibration, daemon=True).start()
+
+    def _run_calibration(self):
+        # Always post back, whatever goes wrong, so the action is
+        # re-enabled and the failure reaches the user
+        result = None
+        try:
+            result = LatencyCalibrator(self.audio_engine).run()
+        except Exception as e:
+            result = {"error": str(e) or type(e).__name__}
+        finally:
+            self.latency_calibrated.emit(result)
+
+    def _show_latency(self, result):
+        self.latency_action.setEnabled(True)
+        self.statusBar().clearMessage()
+
+        if result and "error" in result:
+            self.statusBar().showMessage(
+                f"Latency calibration failed: {result['error']}"
+            )
+            QMessageBox.warning(
+                self,
+                "Calibrate Latency",
+                f"Latency calibration failed:\n{result['error']}",
+            )
+            return
+
+        if not result or "latency_ms" not in result:
+            QMessageBox.warning(
+                self,
+                "Calibrate Latency",
+                "The test signal was not picked up by the input.",
+            )
+            return
+
+        save_latency(self.settings, result)
+        load_latency(self.audio_engine, self.settings)
+
+        trials = len(result["latencies_ms"])
+        QMessageBox.information(
+            self,
+            "Calibrate Latency",
+            f"Round-trip latency: {result['latency_ms']:.2f} ms\n"
+            f"Jitter: {result['jitter_ms']:.2f} ms "
+            f"({trials - result['failed']} of {trials} trials)",
+        )
+
+    # -------------------------
+
     def _load_settings(self):
         a4 = self.settings.get("a4", 440)
         volume = self.settings.get("fork_volume", 30)
         bpm = self.settings.get("bpm", 120)
         signature = self.settings.get("signature", "4/4")
 
+        load_latency(self.audio_engine, self.settings)
+
         self.tuner_tab.a4_spin.setValue(a4)
         self.tuner_tab.volume_slider.setValue(volume)
 
@@ -106,6 +212,7 @@ with Progressive Practice Mode
 
         self.audio_engine.stop_input_stream()
         self.audio_engine.stop_output_stream()
+        self.audio_engine.metrics.stop_dump()
 
         self._save_settings()
 
@@ -10,12 +10,8 @@ from PySide6.QtWidgets import (
     QGroupBox,
 )
 from PySide6.QtCore import Qt, Signal
-from collections import deque
-import numpy as np
-
-from core.tuner_engine import TunerEngine
+from core.pipeline import tuner_pipeline
 from core.tone_generator import ToneGenerator
-from utils.note_utils import frequency_to_note
 from ui.tuner_meter import TunerMeter
 
 
@@ -28,20 +24,33 @@ NOTE_NAMES = [
 class TunerWidget(QWidget):
 
     pitch_detected = Signal(str, float, float)
+    # Per-channel (names, frequencies, cents) arrays on multi-channel
+    # input ("" and NaN for unvoiced channels)
+    channels_detected = Signal(object)
 
     def __init__(self, audio_engine):
         super().__init__()
 
         self.audio_engine = audio_engine
-        self.tuner = TunerEngine(buffer_size=2048)
+        # [decimate ->] framer -> dc -> gate -> detector -> smoother ->
+        # notes; pipeline.stats() has the per-stage timings. Decimation
+        # only kicks in at high device rates (decimate="auto").
+        self.pipeline = tuner_pipeline(
+            self.audio_engine.samplerate,
+            buffer_size=2048,
+            hop_size=512,
+            decimate="auto",
+        )
         self.tone_generator = ToneGenerator(self.audio_engine)
 
-        self.freq_buffer = deque(maxlen=5)
+        # Input channel displayed on multi-channel interfaces
+        self.display_channel = 0
 
         self._setup_ui()
         self._setup_audio()
 
         self.pitch_detected.connect(self.update_ui)
+        self.channels_detected.connect(self.update_channels)
 
     # ------------------------------------------------
     # UI
@@ -64,6 +73,33 @@ class TunerWidget(QWidget):
         main_layout.addWidget(self.freq_label)
         main_layout.addWidget(self.meter)
 
+        # Input channel (multi-input interfaces only)
+        if self.audio_engine.channels > 1:
+            channel_layout = QHBoxLayout()
+            channel_layout.addWidget(QLabel("Input channel:"))
+
+            self.channel_spin = QSpinBox()
+            self.channel_spin.setRange(1, self.audio_engine.channels)
+            self.channel_spin.valueChanged.connect(self.change_channel)
+
+            channel_layout.addWidget(self.channel_spin)
+            main_layout.addLayout(channel_layout)
+
+            # One readout row per input channel: note, Hz, cents
+            channels_group = QGroupBox("All Channels")
+            channels_grid = QGridLayout()
+            self.channel_labels = []
+
+            for channel in range(self.audio_engine.channels):
+                labels = [QLabel("--"), QLabel("-- Hz"), QLabel("--")]
+                channels_grid.addWidget(QLabel(f"{channel + 1}:"), channel, 0)
+                for column, label in enumerate(labels, 1):
+                    channels_grid.addWidget(label, channel, column)
+                self.channel_labels.append(labels)
+
+            channels_group.setLayout(channels_grid)
+            main_layout.addWidget(channels_group)
+
         # Fork section
         fork_group = QGroupBox("Reference Tone")
         fork_layout = QVBoxLayout()
@@ -150,19 +186,21 @@ class TunerWidget(QWidget):
     # ------------------------------------------------
 
     def audio_callback(self, block):
-        freq = self.tuner.process(block)
+        # (channels, samples) blocks go through whole: the pipeline tracks
+        # every channel in one pass, the selected one is displayed
+        for note, freq, cents in self.pipeline.process(block):
+            if block.ndim == 2:
+                self.channels_detected.emit((note, freq, cents))
 
-        if freq:
-            self.freq_buffer.append(freq)
-            smooth_freq = np.median(self.freq_buffer)
+                c = self.display_channel
+                note, freq, cents = note[c], freq[c], cents[c]
+                if not note:
+                    continue
 
-            note, ref_freq, cents = frequency_to_note(
-                smooth_freq,
-                a4=self.a4_spin.value()
-            )
+            self.pitch_detected.emit(str(note), float(freq), float(cents))
 
-            if note:
-                self.pitch_detected.emit(note, smooth_freq, cents)
+    def change_channel(self, value):
+        self.display_channel = value - 1
 
     # ------------------------------------------------
     # UI Update
@@ -173,6 +211,22 @@ class TunerWidget(QWidget):
         self.freq_label.setText(f"{freq:.2f} Hz")
         self.meter.set_cents(cents)
 
+    def update_channels(self, result):
+        names, frequencies, cents = result
+        for labels, name, freq, offset in zip(
+            self.channel_labels, names, frequencies, cents
+        ):
+            note_label, freq_label, cents_label = labels
+            if not name:
+                note_label.setText("--")
+                freq_label.setText("-- Hz")
+                cents_label.setText("--")
+                continue
+
+            note_label.setText(str(name))
+            freq_label.setText(f"{freq:.2f} Hz")
+            cents_label.setText(f"{offset:+.1f} c")
+
     # ------------------------------------------------
     # Fork Controls
     # ------------------------------------------------
@@ -186,6 +240,7 @@ class TunerWidget(QWidget):
 
     def change_a4(self, value):
         self.tone_generator.set_a4(value)
+        self.pipeline.get("notes").a4 = value
 
     def toggle_tone(self):
         if self.tone_generator.running:
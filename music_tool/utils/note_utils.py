@@ -1,17 +1,67 @@
+import math
+from functools import lru_cache
 import numpy as np
 
 NOTE_NAMES = ["C", "C#", "D", "D#", "E", "F",
               "F#", "G", "G#", "A", "A#", "B"]
 
+# MIDI notes covered by note_table(); anything outside falls back to
+# computing the name and frequency directly.
+MIDI_RANGE = 128
+
+
+@lru_cache(maxsize=8)
+def note_table(a4=440.0):
+    """
+    Note names and equal-tempered frequencies for MIDI 0..127 at this A4,
+    built once per A4 value (a new a4 builds and caches a new table).
+
+    Returns read-only arrays:
+        names (str)
+        frequencies (float)
+    """
+    midi = np.arange(MIDI_RANGE)
+    names = np.array([midi_to_note_name(m) for m in midi])
+    frequencies = midi_to_frequency(midi, a4)
+
+    names.flags.writeable = False
+    frequencies.flags.writeable = False
+    return names, frequencies
+
+
+@lru_cache(maxsize=8)
+def _scalar_table(a4):
+    # Plain tuples: indexing them is cheaper than an ndarray lookup, which
+    # matters on the per-frame live path
+    names, frequencies = note_table(a4)
+    return tuple(names.tolist()), tuple(frequencies.tolist())
+
+
+def _is_array(value):
+    return isinstance(value, (list, tuple)) or (
+        isinstance(value, np.ndarray) and value.ndim > 0
+    )
+
 
 def frequency_to_midi(frequency, a4=440.0):
+    """
+    Fractional MIDI number. Arrays give arrays, with NaN for non-positive
+    or NaN frequencies; a non-positive scalar gives None.
+    """
+    if _is_array(frequency):
+        frequency = np.asarray(frequency, dtype=float)
+        midi = np.full(frequency.shape, np.nan)
+        valid = frequency > 0
+        midi[valid] = 69 + 12 * np.log2(frequency[valid] / a4)
+        return midi
+
     if frequency <= 0:
         return None
     return 69 + 12 * np.log2(frequency / a4)
 
 
 def midi_to_frequency(midi_note, a4=440.0):
-    return a4 * (2 ** ((midi_note - 69) / 12))
+    return a4 * (2 ** ((np.asarray(midi_note) - 69) / 12))
 
 
 def midi_to_note_name(midi_note):
@@ -21,7 +71,10 @@ def midi_to_note_name(midi_note):
 
 
 def cents_difference(frequency, reference_frequency):
-    return 1200 * np.log2(frequency / reference_frequency)
+    # Element-wise for arrays
+    return 1200 * np.log2(
+        np.asarray(frequency) / np.asarray(reference_frequency)
+    )
 
 
 def frequency_to_note(frequency, a4=440.0):
@@ -30,16 +83,65 @@ def frequency_to_note(frequency, a4=440.0):
         note_name (str)
         nearest_frequency (float)
         cents (float)
+
+    For an array of frequencies the three results are arrays ("" and NaN
+    where the frequency is non-positive or NaN); see frequencies_to_notes.
     """
-    if frequency is None or frequency <= 0:
+    if frequency is None:
         return None, None, None
 
-    midi = frequency_to_midi(frequency, a4)
+    if _is_array(frequency):
+        return frequencies_to_notes(frequency, a4)
+
+    if frequency <= 0:
+        return None, None, None
+
+    midi = 69 + 12 * math.log2(frequency / a4)
     nearest_midi = int(round(midi))
 
+    # One log2 per call: cents follow from the MIDI fraction
+    cents = 100 * (midi - nearest_midi)
+
+    if 0 <= nearest_midi < MIDI_RANGE:
+        names, frequencies = _scalar_table(a4)
+        return names[nearest_midi], frequencies[nearest_midi], cents
+
     nearest_freq = midi_to_frequency(nearest_midi, a4)
-    cents = cents_difference(frequency, nearest_freq)
+    return midi_to_note_name(nearest_midi), nearest_freq, cents
+
+
+def frequencies_to_notes(frequencies, a4=440.0):
+    """
+    Vectorized frequency_to_note over an array.
+
+    Returns:
+        names (str ndarray, "" where unvoiced)
+        nearest_frequencies (ndarray, NaN where unvoiced)
+        cents (ndarray, NaN where unvoiced)
+    """
+    midi = frequency_to_midi(frequencies, a4)
+    nearest = np.rint(midi)
+    cents = 100 * (midi - nearest)
+
+    names = np.full(midi.shape, "", dtype="U5")
+    nearest_freq = np.full(midi.shape, np.nan)
+
+    valid = ~np.isnan(nearest)
+    index = nearest[valid].astype(int)
+    in_table = (index >= 0) & (index < MIDI_RANGE)
+
+    table_names, table_freqs = note_table(a4)
+
+    valid_names = np.empty(len(index), dtype="U5")
+    valid_names[in_table] = table_names[index[in_table]]
+    valid_names[~in_table] = [
+        midi_to_note_name(m) for m in index[~in_table]
+    ]
+    names[valid] = valid_names
 
-    note_name = midi_to_note_name(nearest_midi)
+    valid_freqs = np.empty(len(index))
+    valid_freqs[in_table] = table_freqs[index[in_table]]
+    valid_freqs[~in_table] = midi_to_frequency(index[~in_table], a4)
+    nearest_freq[valid] = valid_freqs
 
-    return note_name, nearest_freq, cents
\ No newline at end of file
+    return names, nearest_freq, cents
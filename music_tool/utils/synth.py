@@ -0,0 +1,87 @@
+import numpy as np
+
+
+def tone(frequency, n_samples, sample_rate=44100, harmonics=(1.0,),
+         amplitude=0.5, phase=0.0):
+    """
+    Sum of harmonics of frequency; harmonics[k] is the relative amplitude
+    of partial k + 1. Normalised so the peak is about amplitude.
+    """
+    t = np.arange(n_samples) / sample_rate
+    x = np.zeros(n_samples)
+
+    for k, weight in enumerate(harmonics, start=1):
+        if weight:
+            x += weight * np.sin(2 * np.pi * k * frequency * t + k * phase)
+
+    return (amplitude * x / sum(abs(w) for w in harmonics)).astype("float32")
+
+
+def white_noise(n_samples, amplitude=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    return (amplitude * rng.standard_normal(n_samples)).astype("float32")
+
+
+def plucked_string(frequency, n_samples, sample_rate=44100, n_harmonics=16,
+                   decay=1.5, inharmonicity=1e-4, amplitude=0.5, seed=0):
+    """
+    Additive plucked-string model: partial k has amplitude 1/k, decays
+    faster the higher it is, and is stretched by the string stiffness
+    (f_k = k * f * sqrt(1 + B * k^2)).
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_samples) / sample_rate
+    x = np.zeros(n_samples)
+    nyquist = sample_rate / 2
+
+    for k in range(1, n_harmonics + 1):
+        f_k = k * frequency * np.sqrt(1 + inharmonicity * k * k)
+        if f_k >= nyquist:
+            break
+        envelope = np.exp(-decay * np.sqrt(k) * t)
+        x += envelope * np.sin(2 * np.pi * f_k * t + rng.uniform(0, 2 * np.pi)) / k
+
+    return (amplitude * x / np.max(np.abs(x))).astype("float32")
+
+
+def vibrato_tone(frequency, n_samples, sample_rate=44100, depth_cents=30.0,
+                 rate=5.5, harmonics=(1.0, 0.5, 0.25), amplitude=0.5):
+    """
+    Harmonic tone with sinusoidal pitch modulation.
+
+    Returns:
+        signal (float32)
+        f0 (instantaneous fundamental per sample, Hz)
+    """
+    t = np.arange(n_samples) / sample_rate
+    f0 = frequency * 2 ** (depth_cents / 1200 * np.sin(2 * np.pi * rate * t))
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+
+    x = np.zeros(n_samples)
+    for k, weight in enumerate(harmonics, start=1):
+        x += weight * np.sin(k * phase)
+
+    x *= amplitude / sum(abs(w) for w in harmonics)
+    return x.astype("float32"), f0
+
+
+def octave_ambiguous(frequency, n_samples, sample_rate=44100,
+                     fundamental=0.1, amplitude=0.5):
+    """
+    Tone whose fundamental is weak next to a strong second harmonic,
+    the classic trigger for octave-up errors.
+    """
+    return tone(
+        frequency, n_samples, sample_rate,
+        harmonics=(fundamental, 1.0, 0.3, 0.5),
+        amplitude=amplitude,
+    )
+
+
+def add_noise(x, snr_db, seed=0):
+    """
+    x plus white noise at the given signal-to-noise ratio (dB).
+    """
+    signal_power = np.mean(np.asarray(x, dtype=float) ** 2)
+    noise_rms = np.sqrt(signal_power / 10 ** (snr_db / 10))
+    return (x + white_noise(len(x), noise_rms, seed)).astype("float32")
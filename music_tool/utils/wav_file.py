@@ -0,0 +1,205 @@
+import os
+import struct
+import numpy as np
+
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavReader:
+    """
+    Memory-mapped WAV reader.
+
+    The sample data is mapped, not loaded, so files of any size (including
+    RF64 files over 4 GB) can be read in bounded chunks with read().
+    Supports 8/16/24/32-bit PCM and 32/64-bit float.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, "rb") as f:
+            self._parse_header(f)
+
+        file_size = os.path.getsize(path)
+        available = (file_size - self._data_offset) // self._block_align
+        self.frames = min(self._data_size // self._block_align, available)
+
+        self._data = np.memmap(
+            path,
+            dtype=self._dtype,
+            mode="r",
+            offset=self._data_offset,
+            shape=(self.frames, self.channels * self._values_per_sample),
+        )
+
+    # -------------------------
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate
+
+    def read(self, start, stop, channel=None):
+        """
+        Frames [start, stop) as float32 in [-1, 1]. With channel=None all
+        channels are mixed down to mono.
+        """
+        start = max(0, start)
+        stop = min(self.frames, stop)
+        raw = self._data[start:max(start, stop)]
+
+        samples = self._to_float(raw)
+
+        if channel is not None:
+            return np.ascontiguousarray(samples[:, channel])
+        if self.channels == 1:
+            return samples[:, 0]
+        return samples.mean(axis=1, dtype="float32")
+
+    def close(self):
+        mm = getattr(self._data, "_mmap", None)
+        self._data = None
+        if mm is not None:
+            mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------------------------
+
+    def _parse_header(self, f):
+        riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+        if riff not in (b"RIFF", b"RF64") or wave != b"WAVE":
+            raise ValueError(f"{self.path} is not a WAV file")
+
+        ds64_data_size = None
+        fmt = None
+
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{self.path} has no data chunk")
+
+            chunk_id, size = struct.unpack("<4sI", header)
+
+            if chunk_id == b"ds64":
+                _, ds64_data_size = struct.unpack("<QQ", f.read(16))
+                f.seek(size - 16 + (size & 1), os.SEEK_CUR)
+
+            elif chunk_id == b"fmt ":
+                fmt = f.read(size)
+                if size & 1:
+                    f.seek(1, os.SEEK_CUR)
+
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError(f"{self.path}: data before fmt chunk")
+                self._data_offset = f.tell()
+                if size == 0xFFFFFFFF and ds64_data_size is not None:
+                    size = ds64_data_size
+                self._data_size = size
+                break
+
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+        self._parse_fmt(fmt)
+
+    def _parse_fmt(self, fmt):
+        (
+            audio_format,
+            self.channels,
+            self.sample_rate,
+            _,
+            self._block_align,
+            bits,
+        ) = struct.unpack("<HHIIHH", fmt[:16])
+
+        if audio_format == WAVE_FORMAT_EXTENSIBLE:
+            audio_format = struct.unpack("<H", fmt[24:26])[0]
+
+        self.sample_width = bits // 8
+        self._values_per_sample = 1
+
+        if audio_format == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+            self._dtype = np.dtype(f"<f{self.sample_width}")
+        elif audio_format == WAVE_FORMAT_PCM and bits == 8:
+            self._dtype = np.dtype("u1")
+        elif audio_format == WAVE_FORMAT_PCM and bits in (16, 32):
+            self._dtype = np.dtype(f"<i{self.sample_width}")
+        elif audio_format == WAVE_FORMAT_PCM and bits == 24:
+            # Mapped as raw bytes, assembled into int32 in _to_float
+            self._dtype = np.dtype("u1")
+            self._values_per_sample = 3
+        else:
+            raise ValueError(
+                f"{self.path}: unsupported WAV format "
+                f"{audio_format:#06x} with {bits} bits"
+            )
+
+    def _to_float(self, raw):
+        if self._dtype.kind == "f":
+            return raw.astype("float32")
+
+        if self._values_per_sample == 3:
+            b = raw.reshape(len(raw), self.channels, 3).astype(np.int32)
+            value = b[..., 0] | (b[..., 1] << 8) | (b[..., 2] << 16)
+            value -= (value & 0x800000) << 1
+            return (value / 8388608.0).astype("float32")
+
+        if self._dtype == np.uint8:
+            return ((raw.astype("float32") - 128.0) / 128.0)
+
+        scale = float(2 ** (8 * self.sample_width - 1))
+        return (raw / scale).astype("float32")
+
+
+def create_wav(path, frames, sample_rate, channels=1):
+    """
+    Create a 32-bit float WAV file of frames silent frames and return its
+    sample data as a writable memmap, (frames,) for mono or (frames,
+    channels). Whatever is written to the map ends up in the file (call
+    flush() or drop the map when done), so outputs larger than RAM can
+    be rendered in place.
+    """
+    block_align = 4 * channels
+    data_size = frames * block_align
+
+    # fmt with cbSize, then the fact chunk float files should carry
+    header = b"".join((
+        struct.pack("<4sI", b"fmt ", 18),
+        struct.pack(
+            "<HHIIHHH",
+            WAVE_FORMAT_IEEE_FLOAT,
+            channels,
+            sample_rate,
+            sample_rate * block_align,
+            block_align,
+            32,
+            0,
+        ),
+        struct.pack("<4sII", b"fact", 4, frames),
+        struct.pack("<4sI", b"data", data_size),
+    ))
+    data_offset = 12 + len(header)
+
+    riff_size = 4 + len(header) + data_size
+    if riff_size > 0xFFFFFFFF:
+        raise ValueError(f"{path}: {frames} frames do not fit in a WAV file")
+
+    with open(path, "wb") as f:
+        f.write(struct.pack("<4sI4s", b"RIFF", riff_size, b"WAVE"))
+        f.write(header)
+        # Extending the file leaves the data zeroed (sparse where the
+        # file system allows)
+        f.truncate(data_offset + data_size)
+
+    shape = (frames,) if channels == 1 else (frames, channels)
+    return np.memmap(
+        path, dtype="<f4", mode="r+", offset=data_offset, shape=shape
+    )